@@ -0,0 +1,85 @@
+# Creeper Benchmark: Bulk Seeds
+# Pages/sec of a seed file crawled in bulk, against the same seeds passed
+# as target URLs, crawled one after another. Each seed is a local site
+# answering after --latency seconds, like a remote host
+# Usage: python benchmarks/bulk_seeds.py [--seeds N] [--active 1 8 64 ...]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def get_crawl_seconds(crawler, url_list, config):
+    # Return seconds crawler takes on a job, and the pages it fetched
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl(url_list, config)
+
+    return time.perf_counter() - start_time, creeper.page_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seeds', type=int, default=32)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--active', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--budget', type=int,
+                        help='Pages fetched per seed (default: all)')
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp()
+    seed_path = os.path.join(run_dir, 'seeds.txt')
+    url_list = []
+
+    for seed in range(args.seeds):  # Every page is slow, like a remote host
+        site = fixtures.SyntheticSite(args.pages, args.fan_out, args.depth,
+                                      slow_rate=1.0,
+                                      slow_seconds=args.latency, seed=seed)
+        url_list.append(fixtures.get_url(
+            fixtures.get_started_server(fixtures.HTTPServer(site))))
+
+    with open(seed_path, 'w') as seed_file:
+        seed_file.write('\n'.join(url_list) + '\n')
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    crawler = creeper.Crawler()
+    config_dict = {'total_depth': args.depth + 1, 'print_level': 0,
+                   'is_concurrent_mode': True, 'is_save_mode': False}
+
+    print('{:<18} {:>8} {:>10} {:>10}'.format(
+        'mode', 'pages', 'seconds', 'pages/sec'))
+
+    result_list = [('one at a time', get_crawl_seconds(
+        crawler, url_list, creeper.CrawlConfig(**config_dict)))]
+
+    for active in args.active:
+        result_list.append(('bulk, ' + str(active) + ' active',
+                            get_crawl_seconds(crawler, [], creeper.CrawlConfig(
+                                seed_file_path=seed_path,
+                                max_active_seeds=active,
+                                seed_page_budget=args.budget,
+                                **config_dict))))
+
+    for name, (seconds, page_count) in result_list:
+        print('{:<18} {:>8} {:>10.2f} {:>10.1f}'.format(
+            name, page_count, seconds, page_count / seconds))
+
+    crawler.close()
+    shutil.rmtree(run_dir)
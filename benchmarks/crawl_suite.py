@@ -0,0 +1,281 @@
+# Creeper Benchmark: Crawl Suite
+# Crawl generated sites on local HTTP and FTP fixture servers as Crawler
+# jobs, and write pages/sec, p50 and p99 page latency, peak RSS and CPU
+# time of each scenario to a JSON file. Pass an earlier file as --baseline
+# to compare
+# A scenario whose crawl dies or outlasts --timeout is reported as failed
+# Usage: python benchmarks/crawl_suite.py [--output FILE] [--baseline FILE]
+
+from contextlib import redirect_stdout
+from datetime import datetime
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+# Site is SyntheticSite arguments, server those of its fixture server and
+# config the CrawlConfig the Crawler job is run with
+scenario_list = [
+    {'name': 'http-sequential', 'scheme': 'http', 'server': {},
+     'config': {'is_concurrent_mode': False},
+     'site': {'page_count': 300, 'fan_out': 4, 'depth': 4}},
+    {'name': 'http-concurrent', 'scheme': 'http', 'server': {},
+     'config': {'is_concurrent_mode': True},
+     'site': {'page_count': 300, 'fan_out': 4, 'depth': 4}},
+    {'name': 'http-wide-duplicates', 'scheme': 'http', 'server': {},
+     'config': {'is_concurrent_mode': True},
+     'site': {'page_count': 1000, 'fan_out': 12, 'depth': 3,
+              'cross_links': 8, 'duplicate_rate': 0.5}},
+    {'name': 'http-slow-endpoints', 'scheme': 'http', 'server': {},
+     'config': {'is_concurrent_mode': True},
+     'site': {'page_count': 300, 'fan_out': 4, 'depth': 4,
+              'slow_rate': 0.1, 'slow_seconds': 0.2}},
+    {'name': 'ftp-sequential', 'scheme': 'ftp', 'server': {},
+     'config': {'is_concurrent_mode': False},
+     'site': {'page_count': 100, 'fan_out': 3, 'depth': 4}},
+    {'name': 'ftp-list-only', 'scheme': 'ftp', 'server': {'has_mlsd': False},
+     'config': {'is_concurrent_mode': False},
+     'site': {'page_count': 100, 'fan_out': 3, 'depth': 4}},
+    ]
+
+
+def get_peak_rss():  # Return peak resident memory of this process in MB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform == 'darwin':  # Bytes there, KB elsewhere
+        return peak / 1024**2
+
+    return peak / 1024
+
+
+def get_percentile(sorted_list, percent):
+    if not sorted_list:
+        return None
+
+    return sorted_list[min(int(len(sorted_list) * percent / 100),
+                           len(sorted_list) - 1)]
+
+
+def get_regression_list(result_dict, baseline_dict, tolerance):
+    # Return lines for metrics worse than baseline by more than tolerance
+    baseline_by_name = {scenario['name']: scenario['results']
+                        for scenario in baseline_dict['scenarios']}
+    line_list = []
+
+    for scenario in result_dict['scenarios']:
+        baseline = baseline_by_name.get(scenario['name'])
+
+        if baseline is None:
+            continue
+
+        for metric, is_higher_better in [('pages_per_sec', True),
+                                         ('p50_ms', False),
+                                         ('p99_ms', False),
+                                         ('cpu_seconds', False),
+                                         ('peak_rss_mb', False)]:
+            old = baseline.get(metric)
+            new = scenario['results'].get(metric)
+
+            if not old or new is None:
+                continue
+
+            change = (new - old) / old
+
+            if (-change if is_higher_better else change) > tolerance:
+                line_list.append('{:<22} {:<14} {:>10.2f} -> {:>10.2f} '
+                                 '({:+.1f}%)'.format(scenario['name'],
+                                                     metric, old, new,
+                                                     change * 100))
+
+    return line_list
+
+
+def get_run_results(process, result_queue, timeout):
+    # Return results process puts on result_queue, or an error if it dies
+    # first or takes over timeout seconds
+    end_time = time.monotonic() + timeout
+
+    while time.monotonic() < end_time:
+        is_alive = process.is_alive()  # Before get(), so its results are in
+
+        try:
+            return result_queue.get(timeout=1)
+        except queue.Empty:
+            if not is_alive:
+                return {'error': 'exited with code ' + str(process.exitcode)}
+
+    process.terminate()
+
+    return {'error': 'timed out after ' + str(timeout) + ' seconds'}
+
+
+def get_scenario_results(scenario, repeat, timeout):
+    # Return results of the best of repeat crawls of scenario, by pages/sec,
+    # or the error of the first that failed
+    site = fixtures.SyntheticSite(**scenario['site'])
+
+    if scenario['scheme'] == 'ftp':
+        server = fixtures.get_started_server(
+            fixtures.FTPServer(site, **scenario['server']))
+    else:
+        server = fixtures.get_started_server(
+            fixtures.HTTPServer(site, **scenario['server']))
+
+    context = multiprocessing.get_context('spawn')
+    best = None
+
+    for _ in range(repeat):
+        result_queue = context.Queue()
+        process = context.Process(
+            target=run_crawl,
+            args=(fixtures.get_url(server),
+                  dict(scenario['config'], total_depth=site.depth + 1),
+                  result_queue))
+        process.start()
+        results = get_run_results(process, result_queue, timeout)
+        process.join()
+
+        if 'error' in results:
+            best = results
+
+            break
+
+        if best is None or results['pages_per_sec'] > best['pages_per_sec']:
+            best = results
+
+    server.shutdown()
+    server.server_close()
+
+    return best
+
+
+def run_crawl(seed_url, config_dict, result_queue):
+    # Crawl seed_url as a Crawler job with config_dict, in a process of its
+    # own so peak RSS and CPU time are this crawl's alone
+    # get_code() is wrapped only to time each fetch, failed ones too
+    latency_list = []
+    get_code = creeper.get_code
+
+    def timed_get_code(*args):
+        fetch_time = time.perf_counter()
+
+        try:
+            return get_code(*args)
+        finally:
+            latency_list.append(time.perf_counter() - fetch_time)
+
+    creeper.get_code = timed_get_code
+    run_dir = tempfile.mkdtemp()
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    crawler = creeper.Crawler(creeper.CrawlConfig(
+        is_save_mode=False, print_level=0, **config_dict))
+
+    start_time = time.perf_counter()
+    start_cpu = os.times()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([seed_url])
+
+    seconds = time.perf_counter() - start_time
+    end_cpu = os.times()
+    latency_list.sort()
+    crawler.close()
+    shutil.rmtree(run_dir)
+
+    result_queue.put({
+        'pages': creeper.page_count,
+        'errors': creeper.error_count,
+        'seconds': round(seconds, 4),
+        'pages_per_sec': round(creeper.page_count / seconds, 2),
+        'p50_ms': round(get_percentile(latency_list, 50) * 1000, 3),
+        'p99_ms': round(get_percentile(latency_list, 99) * 1000, 3),
+        'peak_rss_mb': round(get_peak_rss(), 1),
+        'cpu_seconds': round(end_cpu.user - start_cpu.user +
+                             end_cpu.system - start_cpu.system, 3)})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', default='crawl_suite.json')
+    parser.add_argument('--baseline',
+                        help='Earlier output to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Change allowed before a regression (0.1 = 10%%)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300,
+                        help='Seconds a crawl may take before it fails')
+    parser.add_argument('--scenario', nargs='+',
+                        help='Names of the scenarios to run (default: all)')
+    args = parser.parse_args()
+
+    result_dict = {'timestamp': datetime.now().isoformat(),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'cpu_count': os.cpu_count(),
+                   'scenarios': []}
+    failed_list = []  # Names of the scenarios that failed
+
+    print('{:<22} {:>6} {:>10} {:>10} {:>10} {:>10} {:>8}'.format(
+        'scenario', 'pages', 'pages/sec', 'p50 ms', 'p99 ms', 'RSS MB',
+        'CPU s'))
+
+    for scenario in scenario_list:
+        if args.scenario and scenario['name'] not in args.scenario:
+            continue
+
+        results = get_scenario_results(scenario, args.repeat, args.timeout)
+        result_dict['scenarios'].append(dict(scenario, results=results))
+
+        if 'error' in results:
+            failed_list.append(scenario['name'])
+            print('{:<22} failed, {}'.format(scenario['name'],
+                                             results['error']))
+
+            continue
+
+        print('{:<22} {:>6} {:>10.1f} {:>10.2f} {:>10.2f} {:>10.1f} '
+              '{:>8.2f}'.format(scenario['name'],
+                                results['pages'],
+                                results['pages_per_sec'],
+                                results['p50_ms'],
+                                results['p99_ms'],
+                                results['peak_rss_mb'],
+                                results['cpu_seconds']))
+
+    with open(args.output, 'w') as output_file:
+        json.dump(result_dict, output_file, indent=2)
+
+    print('\nResults: ' + args.output)
+
+    if failed_list:
+        print('Failed: ' + ', '.join(failed_list))
+
+    regression_list = []
+
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regression_list = get_regression_list(
+                result_dict, json.load(baseline_file), args.tolerance)
+
+        print('\n'.join(['Regressions:'] + regression_list)
+              if regression_list else 'No regressions')
+
+    sys.exit(1 if failed_list or regression_list else 0)
@@ -0,0 +1,75 @@
+# Creeper Benchmark: Dedup Index
+# Memory and throughput of DedupIndex, exact and compact, as it grows
+# Usage: python benchmarks/dedup_index.py [--sizes 100000 1000000 ...]
+
+from datetime import datetime
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+def get_check_links(start, count):  # Yield check links like crawl() makes
+    for i in range(start, start + count):
+        yield ('http://example.org/section-' + str(i % 997) +
+               '/page-' + str(i) + '.html')
+
+
+def get_rate(count, start_time):
+    return count / max((datetime.now() - start_time).total_seconds(), 1e-9)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10**5, 10**6, 10**7])
+    parser.add_argument('--lookups', type=int, default=10**5)
+    parser.add_argument('--error-rate', type=float, default=0.001)
+    args = parser.parse_args()
+
+    creeper.dedup_error_rate = args.error_rate
+
+    print('{:<8} {:>10} {:>10} {:>12} {:>12} {:>12} {:>8}'.format(
+        'mode', 'urls', 'MB', 'adds/sec', 'hits/sec', 'misses/sec',
+        'fp rate'))
+
+    for size in args.sizes:
+        for is_compact in [False, True]:
+            creeper.dedup_capacity = size
+            index = creeper.DedupIndex(is_compact)
+            lookup_count = min(args.lookups, size)
+
+            start_time = datetime.now()
+
+            for check_link in get_check_links(0, size):
+                index.add(check_link)
+
+            add_rate = get_rate(size, start_time)
+            start_time = datetime.now()
+
+            for check_link in get_check_links(0, lookup_count):
+                check_link in index
+
+            hit_rate = get_rate(lookup_count, start_time)
+            false_positive_count = 0
+            start_time = datetime.now()
+
+            for check_link in get_check_links(size, lookup_count):
+                false_positive_count += check_link in index
+
+            miss_rate = get_rate(lookup_count, start_time)
+
+            print('{:<8} {:>10} {:>10.1f} {:>12.0f} {:>12.0f} {:>12.0f} '
+                  '{:>8.5f}'.format(
+                      'compact' if is_compact else 'exact',
+                      size,
+                      index.get_memory_size() / 1024**2,
+                      add_rate,
+                      hit_rate,
+                      miss_rate,
+                      false_positive_count / lookup_count))
+
+            del index
@@ -0,0 +1,72 @@
+# Creeper Benchmark: Distributed Crawl
+# Pages/sec of crawl_workers() over local sites, one per host, as workers
+# are added. Each site answers after --latency seconds, like a remote host
+# Usage: python benchmarks/distributed.py [--hosts N] [--workers 1 2 4 ...]
+
+from datetime import datetime
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def get_crawl_seconds(seed_list, depth, worker_count):
+    # Return seconds crawl_workers() takes, and the pages it fetched
+    state_dir = tempfile.mkdtemp()
+    creeper.worker_count = worker_count
+    creeper.page_count = 0
+    creeper.debug_log_path = os.path.join(state_dir, 'debug.txt')
+    creeper.connection_pool = creeper.ConnectionPool(
+        creeper.max_idle_connections)
+    creeper.page_store = creeper.WorkerStore(
+        os.path.join(state_dir, 'job.sqlite'))
+    start_time = datetime.now()
+
+    creeper.crawl_workers(seed_list, depth)
+
+    seconds = (datetime.now() - start_time).total_seconds()
+    creeper.page_store.close()
+    shutil.rmtree(state_dir)
+
+    return seconds, creeper.page_count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrent', action='store_true')
+    args = parser.parse_args()
+
+    seed_list = []
+
+    for seed in range(args.hosts):  # Every page is slow, like a remote host
+        site = fixtures.SyntheticSite(args.pages, args.fan_out, args.depth,
+                                      slow_rate=1.0,
+                                      slow_seconds=args.latency, seed=seed)
+        seed_list.append(fixtures.get_url(
+            fixtures.get_started_server(fixtures.HTTPServer(site))))
+
+    creeper.is_concurrent_mode = args.concurrent
+    creeper.print_level = 0
+
+    print('{:<8} {:>8} {:>10} {:>10}'.format(
+        'workers', 'pages', 'seconds', 'pages/sec'))
+
+    for worker_count in args.workers:
+        seconds, page_count = get_crawl_seconds(
+            seed_list, args.depth + 1, worker_count)
+
+        print('{:<8} {:>8} {:>10.2f} {:>10.1f}'.format(
+            worker_count, page_count, seconds, page_count / seconds))
@@ -0,0 +1,102 @@
+# Creeper Benchmark: DNS Cache
+# Pages/sec of a seed file of local sites, each under a host name of its
+# own, with and without the DNS cache. Lookups of those names take
+# --dns-latency seconds, like a remote resolver, and give 127.0.0.1
+# Usage: python benchmarks/dns_cache.py [--hosts N] [--dns-latency S]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+host_suffix = '.creeper.test'  # Reserved, so never a real host
+getaddrinfo = socket.getaddrinfo
+lookup_count = 0
+lookup_latency = 0  # Seconds each lookup of a benchmark host takes
+
+
+def get_crawl_seconds(crawler, config):
+    # Return seconds crawler takes on a job, its pages and lookups made
+    global lookup_count
+
+    lookup_count = 0
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([], config)
+
+    return time.perf_counter() - start_time, creeper.page_count, lookup_count
+
+
+def get_slow_address_list(host, port, *args, **kwargs):
+    # Stands in for socket.getaddrinfo(), slow for the benchmark hosts
+    global lookup_count
+
+    if not str(host).endswith(host_suffix):
+        return getaddrinfo(host, port, *args, **kwargs)
+
+    lookup_count += 1
+    time.sleep(lookup_latency)
+
+    return getaddrinfo('127.0.0.1', port, *args, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=32)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=2)
+    parser.add_argument('--dns-latency', type=float, default=0.05)
+    parser.add_argument('--active', type=int, default=8,
+                        help='Seeds crawled at once')
+    args = parser.parse_args()
+
+    lookup_latency = args.dns_latency
+    socket.getaddrinfo = get_slow_address_list
+
+    run_dir = tempfile.mkdtemp()
+    seed_path = os.path.join(run_dir, 'seeds.txt')
+
+    with open(seed_path, 'w') as seed_file:
+        for seed in range(args.hosts):
+            site = fixtures.SyntheticSite(args.pages, args.fan_out,
+                                          args.depth, seed=seed)
+            server = fixtures.get_started_server(fixtures.HTTPServer(site))
+            seed_file.write('http://site' + str(seed) + host_suffix + ':' +
+                            str(server.server_address[1]) + '/index.html\n')
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    config_dict = {'total_depth': args.depth + 1, 'print_level': 0,
+                   'is_concurrent_mode': True, 'is_save_mode': False,
+                   'seed_file_path': seed_path,
+                   'max_active_seeds': args.active}
+
+    print('{:<12} {:>8} {:>8} {:>10} {:>10}'.format(
+        'mode', 'pages', 'lookups', 'seconds', 'pages/sec'))
+
+    for name, is_dns_cache in [('no cache', False), ('cache', True)]:
+        crawler = creeper.Crawler()  # Each starts with nothing resolved
+        seconds, page_count, lookups = get_crawl_seconds(
+            crawler, creeper.CrawlConfig(is_dns_cache=is_dns_cache,
+                                         **config_dict))
+        crawler.close()
+
+        print('{:<12} {:>8} {:>8} {:>10.2f} {:>10.1f}'.format(
+            name, page_count, lookups, seconds, page_count / seconds))
+
+    shutil.rmtree(run_dir)
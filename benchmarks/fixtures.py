@@ -0,0 +1,486 @@
+# Creeper Benchmark Fixtures
+# Generated sites, and local HTTP and FTP servers that serve them
+# Imported by the benchmarks, run alone it serves a site until Ctrl-C
+# Usage: python benchmarks/fixtures.py [--pages N] [--fan-out N] [--depth N]
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import hashlib
+import os
+import random
+import re
+import socket
+import socketserver
+import threading
+import time
+
+
+session_pattern = re.compile(r'/s(\d+)(?=/)')  # Alias of a page, see below
+last_modified = 'Mon, 05 Jan 2026 00:00:00 GMT'  # Of every page, never later
+
+
+class SyntheticSite:
+    # Site of page_count pages, page N is at /l<level>/p<N>.html
+    # The pages are a fan_out-ary tree depth levels deep, numbered breadth
+    # first from /index.html (page 0), and every page also links to
+    # cross_links random pages. Links are written absolute, relative to the
+    # folder, or through '..', and duplicate_rate of them are repeated
+    # alias_rate of the links carry a session in the path, /s<N>/..., like
+    # cookieless sessions. The page echoes it, so it is a near duplicate of
+    # the page, and its relative links copy the site under the session
+    # word_count words of text drawn for each page set it apart from the
+    # others, which share the rest of their text
+    # slow_rate of the pages are slow endpoints, served after slow_seconds
+    # Everything is derived from seed, so a site is the same on every run
+    def __init__(self, page_count=300, fan_out=4, depth=4, cross_links=2,
+                 duplicate_rate=0.2, relative_rate=0.4, back_rate=0.3,
+                 slow_rate=0.0, slow_seconds=0.1, alias_rate=0.0,
+                 word_count=0, seed=0):
+        self.page_count = page_count
+        self.fan_out = fan_out
+        self.depth = depth
+        self.cross_links = cross_links
+        self.duplicate_rate = duplicate_rate
+        self.relative_rate = relative_rate
+        self.back_rate = back_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.alias_rate = alias_rate
+        self.word_count = word_count
+        self.seed = seed
+        self.level_list = []  # Level of each page
+
+        for page in range(page_count):
+            if page == 0:
+                self.level_list.append(0)
+            else:
+                self.level_list.append(
+                    self.level_list[(page - 1) // fan_out] + 1)
+
+    def get_child_list(self, page):  # Return tree children of page
+        if self.level_list[page] >= self.depth - 1:
+            return []
+
+        return [child for child in range(page * self.fan_out + 1,
+                                         page * self.fan_out + 1 +
+                                         self.fan_out)
+                if child < self.page_count]
+
+    def get_folder(self, page):
+        return '/' if page == 0 else '/l' + str(self.level_list[page]) + '/'
+
+    def get_link(self, page, target, link_random):
+        # Return a link from page to target, written one of three ways
+        roll = link_random.random()
+
+        if roll < self.relative_rate and (
+                self.get_folder(page) == self.get_folder(target)):
+            return self.get_name(target)
+
+        if (roll < self.relative_rate + self.back_rate
+                and page != 0 and target != 0):
+            return '../l' + str(self.level_list[target]) + '/' + (
+                self.get_name(target))
+
+        return self.get_path(target)
+
+    def get_name(self, page):
+        return 'index.html' if page == 0 else 'p' + str(page) + '.html'
+
+    def get_page(self, page, session=None):  # Return HTML of page
+        link_random = random.Random(self.seed * 10**9 + page)
+        target_list = self.get_child_list(page) + [
+            link_random.randrange(self.page_count)
+            for _ in range(self.cross_links)]
+        link_list = []
+
+        for target in target_list:
+            link_list.append(self.get_link(page, target, link_random))
+
+            if self.alias_rate and link_random.random() < self.alias_rate:
+                link_list[-1] = ('/s' + str(link_random.randrange(10**6)) +
+                                 self.get_path(target))
+
+            if link_random.random() < self.duplicate_rate:
+                link_list.append(link_list[-1])
+
+        # Drawn apart from the links, so they are the same at any word_count
+        word_random = random.Random('words ' + str(self.seed * 10**9 + page))
+        text = ' '.join('w' + str(word_random.randrange(10000))
+                        for _ in range(self.word_count))
+
+        return ('<html><head><title>Page ' + str(page) + '</title></head>'
+                '<body>\n' + ('<p>Session ' + session + '</p>\n'
+                              if session is not None else '') +
+                '<p>' + 'lorem ipsum dolor sit amet ' * 20 + text + '</p>\n' +
+                ''.join('<a href="' + link + '">Link</a>\n'
+                        for link in link_list) +
+                '</body></html>\n').encode()
+
+    def get_path(self, page):
+        return self.get_folder(page) + self.get_name(page)
+
+    def get_page_number(self, path):  # Return page at path, or None
+        folder, _, name = path.rpartition('/')
+
+        if name in ['', 'index.html'] and folder == '':
+            return 0
+
+        if not (name.startswith('p') and name.endswith('.html')):
+            return None
+
+        number = name[1:-len('.html')]
+
+        if not number.isdigit() or int(number) >= self.page_count:
+            return None
+
+        page = int(number)
+
+        if page == 0 or folder + '/' != self.get_folder(page):
+            return None
+
+        return page
+
+    def get_folder_list(self, folder):
+        # Return (name, is_folder) of everything in folder, or None
+        if folder in ['', '/']:
+            return ([('index.html', False)] +
+                    [('l' + str(level), True)
+                     for level in range(1, max(self.level_list) + 1)])
+
+        name = folder.strip('/')
+
+        if not (name.startswith('l') and name[1:].isdigit()):
+            return None
+
+        level = int(name[1:])
+
+        if level < 1 or level > max(self.level_list):
+            return None
+
+        return [(self.get_name(page), False)
+                for page in range(self.page_count)
+                if self.level_list[page] == level]
+
+    def is_slow(self, page):
+        return random.Random(self.seed * 10**9 - page).random() < (
+            self.slow_rate)
+
+
+class FTPHandler(socketserver.StreamRequestHandler):
+    # Enough of RFC 959 and RFC 3659 for urllib, ftplib and browsers:
+    # USER, PASS, SYST, FEAT, TYPE, PWD, CWD, CDUP, PASV, EPSV, RETR, SIZE,
+    # LIST, NLST, MLSD, NOOP and QUIT, anonymous and read only
+    def handle(self):
+        # Replies are small writes back to back, so Nagle would hold the
+        # second one for the client's delayed ACK, about 40 ms a transfer
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.folder = '/'
+        self.data_server = None
+        self.send_line('220 Creeper fixture FTP server')
+
+        for line in self.rfile:
+            command, _, argument = str(
+                line, 'utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            handler = getattr(self, 'do_' + command, None)
+
+            if command == 'QUIT':
+                self.send_line('221 Goodbye')
+                break
+            elif handler is None or (
+                    command == 'MLSD' and not self.server.has_mlsd):
+                self.send_line('502 Command not implemented')
+            else:
+                handler(argument)
+
+        if self.data_server is not None:
+            self.data_server.close()
+
+    def do_CDUP(self, argument):
+        self.do_CWD('..')
+
+    def do_CWD(self, argument):
+        folder = self.get_path(argument)
+
+        if self.server.site.get_folder_list(folder) is None:
+            self.send_line('550 No such directory')
+        else:
+            self.folder = folder.rstrip('/') + '/'
+            self.send_line('250 OK')
+
+    def do_EPSV(self, argument):
+        self.set_data_server()
+        self.send_line('229 Entering Extended Passive Mode (|||' +
+                       str(self.data_server.getsockname()[1]) + '|)')
+
+    def do_FEAT(self, argument):
+        feature_list = ['SIZE', 'EPSV', 'PASV']
+
+        if self.server.has_mlsd:
+            feature_list.append('MLST type*;size*;')
+
+        self.send_line('211-Features:\r\n ' + '\r\n '.join(feature_list) +
+                       '\r\n211 End')
+
+    def do_LIST(self, argument):
+        self.send_folder(argument, lambda name, is_folder: (
+            ('drwxr-xr-x' if is_folder else '-rw-r--r--') +
+            ' 1 owner group ' + str(self.get_size(name, is_folder)) +
+            ' Jan 01 00:00 ' + name))
+
+    def do_MLSD(self, argument):
+        self.send_folder(argument, lambda name, is_folder: (
+            'type=' + ('dir' if is_folder else 'file') +
+            ';size=' + str(self.get_size(name, is_folder)) + '; ' + name))
+
+    def do_NLST(self, argument):
+        self.send_folder(argument, lambda name, is_folder: name)
+
+    def do_NOOP(self, argument):
+        self.send_line('200 OK')
+
+    def do_OPTS(self, argument):
+        self.send_line('200 OK')
+
+    def do_PASS(self, argument):
+        self.send_line('230 Logged in')
+
+    def do_PASV(self, argument):
+        self.set_data_server()
+        host, port = self.data_server.getsockname()[:2]
+        self.send_line('227 Entering Passive Mode (' +
+                       host.replace('.', ',') + ',' +
+                       str(port // 256) + ',' + str(port % 256) + ')')
+
+    def do_PWD(self, argument):
+        self.send_line('257 "' + (self.folder.rstrip('/') or '/') + '"')
+
+    def do_RETR(self, argument):
+        page = self.server.site.get_page_number(self.get_path(argument))
+
+        if page is None:
+            self.send_line('550 No such file')
+            return
+
+        if self.server.site.is_slow(page):
+            time.sleep(self.server.site.slow_seconds)
+
+        self.send_data(self.server.site.get_page(page))
+
+    def do_SIZE(self, argument):
+        page = self.server.site.get_page_number(self.get_path(argument))
+
+        if page is None:
+            self.send_line('550 No such file')
+        else:
+            self.send_line('213 ' +
+                           str(len(self.server.site.get_page(page))))
+
+    def do_SYST(self, argument):
+        self.send_line('215 UNIX Type: L8')
+
+    def do_TYPE(self, argument):
+        self.send_line('200 Type set')
+
+    def do_USER(self, argument):
+        self.send_line('331 Any password will do')
+
+    def get_path(self, argument):  # Return absolute path of argument
+        if argument.startswith('-'):  # LIST flags, i.e. 'LIST -a'
+            argument = ''
+
+        path = argument if argument.startswith('/') else (
+            self.folder + argument)
+        part_list = []
+
+        for part in path.split('/'):
+            if part == '..':
+                part_list = part_list[:-1]
+            elif part not in ['', '.']:
+                part_list.append(part)
+
+        return '/' + '/'.join(part_list)
+
+    def get_size(self, name, is_folder):
+        if is_folder:
+            return 0
+
+        page = self.server.site.get_page_number(self.get_path(name))
+
+        return len(self.server.site.get_page(page))
+
+    def send_data(self, data):  # Send data over the passive connection
+        if self.data_server is None:
+            self.send_line('425 Use PASV or EPSV first')
+            return
+
+        self.send_line('150 Opening data connection')
+        connection = self.data_server.accept()[0]
+        self.data_server.close()
+        self.data_server = None
+
+        with connection:
+            connection.sendall(data)
+
+        self.send_line('226 Transfer complete')
+
+    def send_folder(self, argument, get_line):
+        folder = self.get_path(argument)
+        folder_list = self.server.site.get_folder_list(folder)
+
+        if folder_list is None:
+            self.send_line('550 No such directory')
+            return
+
+        current_folder, self.folder = self.folder, folder.rstrip('/') + '/'
+        data = ''.join(get_line(name, is_folder) + '\r\n'
+                       for name, is_folder in folder_list).encode()
+        self.folder = current_folder
+        self.send_data(data)
+
+    def send_line(self, line):
+        self.wfile.write((line + '\r\n').encode())
+
+    def set_data_server(self):
+        if self.data_server is not None:
+            self.data_server.close()
+
+        self.data_server = socket.create_server(
+            (self.server.server_address[0], 0))
+        self.data_server.settimeout(10)
+
+
+class FTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, site, host='127.0.0.1', port=0, has_mlsd=True):
+        super().__init__((host, port), FTPHandler)
+        self.site = site
+        self.has_mlsd = has_mlsd  # 502 on MLSD if not, like older servers
+
+
+class HTTPHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?')[0]
+
+        if path == '/robots.txt':
+            self.send_robots()
+            return
+
+        self.server.request_time_list.append(time.monotonic())
+        session = session_pattern.match(path)
+
+        if session is not None:  # Same page, under an alias
+            path = path[session.end():]
+            session = session.group(1)
+
+        page = self.server.site.get_page_number(path)
+
+        if page is None:
+            self.send_error(404)
+            return
+
+        if self.server.site.is_slow(page):
+            time.sleep(self.server.site.slow_seconds)
+
+        body = self.server.site.get_page(page, session)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+        # Unchanged if the ETag matches, or by date if no ETag was sent
+        if (self.headers.get('If-None-Match') == etag or
+                (self.headers.get('If-None-Match') is None and
+                 self.headers.get('If-Modified-Since') == last_modified)):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+
+            with self.server.count_lock:
+                self.server.not_modified_count += 1
+
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+        with self.server.count_lock:
+            self.server.body_bytes += len(body)
+
+    def log_message(self, *args):
+        pass
+
+    def send_robots(self):  # A Crawl-delay, if the server has one
+        if self.server.crawl_delay is None:
+            self.send_error(404)
+            return
+
+        body = ('User-agent: *\nCrawl-delay: ' +
+                str(self.server.crawl_delay) + '\n').encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # At 5, a burst of connects waits on SYN retries
+
+    def __init__(self, site, host='127.0.0.1', port=0, crawl_delay=None):
+        super().__init__((host, port), HTTPHandler)
+        self.site = site
+        self.crawl_delay = crawl_delay  # Seconds robots.txt asks for
+        self.request_time_list = []  # time.monotonic() of each page request
+        self.count_lock = threading.Lock()  # Handlers run on threads
+        self.body_bytes = 0  # Of the pages sent in full
+        self.not_modified_count = 0  # Pages answered with a 304
+
+
+def get_started_server(server):  # Serve on a daemon thread, return server
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+def get_url(server, path='/index.html'):  # Return URL of path on server
+    scheme = 'ftp' if isinstance(server, FTPServer) else 'http'
+    host, port = server.server_address[:2]
+
+    return scheme + '://' + host + ':' + str(port) + path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--http-port', type=int, default=8000)
+    parser.add_argument('--ftp-port', type=int, default=2121)
+    parser.add_argument('--no-mlsd', action='store_true')
+    args = parser.parse_args()
+
+    site = SyntheticSite(args.pages, args.fan_out, args.depth,
+                         slow_rate=args.slow_rate)
+    http_server = get_started_server(
+        HTTPServer(site, port=args.http_port))
+    ftp_server = get_started_server(
+        FTPServer(site, port=args.ftp_port, has_mlsd=not args.no_mlsd))
+
+    print('Serving ' + get_url(http_server) + ' and ' +
+          get_url(ftp_server, '/') + ' (pid ' + str(os.getpid()) + ')')
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,68 @@
+# Creeper Benchmark: Graph Export
+# Time, memory and size of GraphWriter streaming a generated link graph
+# Usage: python benchmarks/graph_export.py [--pages N] [--links N]
+
+from datetime import datetime
+import argparse
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+def get_directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, file_name))
+               for file_name in os.listdir(path))
+
+
+def get_peak_rss():  # Return peak resident memory of this process in MB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform == 'darwin':  # Bytes there, KB elsewhere
+        return peak / 1024**2
+
+    return peak / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=10**6)
+    parser.add_argument('--links', type=int, default=10)
+    parser.add_argument('--format', choices=['npy', 'bin'], default='npy')
+    args = parser.parse_args()
+
+    random.seed(0)
+    creeper.canonical_cache_size = 0  # Every link is new to the cache here
+    graph_dir = tempfile.mkdtemp() + '/'
+    start_rss = get_peak_rss()
+    start_time = datetime.now()
+
+    graph_writer = creeper.GraphWriter(graph_dir, args.format)
+
+    for i in range(args.pages):
+        graph_writer.add_page(
+            'http://example.org/p' + str(i) + '.html',
+            ['http://example.org/p' + str(random.randrange(args.pages)) +
+             '.html' for _ in range(args.links)])
+
+    add_seconds = (datetime.now() - start_time).total_seconds()
+    graph_writer.close()
+    seconds = (datetime.now() - start_time).total_seconds()
+
+    print('Nodes: ' + str(len(graph_writer.node_dict)))
+    print('Edges: ' + str(graph_writer.edge_count))
+    print('Seconds: ' + str(round(seconds, 2)) +
+          ' (' + str(round(add_seconds, 2)) + ' adding pages)')
+    print('Edges/sec: ' + str(round(graph_writer.edge_count / seconds)))
+    print('Peak RSS growth: ' +
+          str(round(get_peak_rss() - start_rss, 1)) + ' MB')
+    print('Files: ' +
+          str(round(get_directory_size(graph_dir) / 1024**2, 1)) + ' MB')
+
+    shutil.rmtree(graph_dir)
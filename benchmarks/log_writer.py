@@ -0,0 +1,110 @@
+# Creeper Benchmark: Log Writer
+# Time write_log() spends on the crawl thread, written directly or by LogWriter
+# Usage: python benchmarks/log_writer.py [--entries N] [--source-kb N]
+
+from datetime import datetime
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+def get_entry_list(entry_count, source_kb):
+    # Return URL, Email and DebugInfo entries like a crawl writes them
+    entry_list = []
+
+    for i in range(entry_count):
+        if i % 100 == 0:  # One page in a hundred has no links to parse
+            code = b'<p>' + b'lorem ipsum ' * (source_kb * 85) + b'</p>'
+            entry_list.append(creeper.DebugInfo(
+                'http://example.org/p' + str(i) + '.html',
+                'No tags detected',
+                'The URL was parsed, but no tags were detected',
+                'SOURCE:\n\n' + creeper.get_debug_source(code)))
+        elif i % 10 == 0:
+            entry_list.append(creeper.Email('me' + str(i) + '@example.org'))
+        else:
+            entry_list.append(creeper.URL(
+                'http://example.org/p' + str(i) + '.html', 2))
+
+    return entry_list
+
+
+def get_write_seconds(entry_list, is_background):
+    # Return mean and p99 seconds per write_log() call, seconds until
+    # everything is on disk, and the size of the debug log
+    log_dir = tempfile.mkdtemp()
+    creeper.url_log_index = creeper.DedupIndex()
+    creeper.email_index = creeper.DedupIndex()
+    creeper.debug_log = open(os.path.join(log_dir, 'debug.txt'), 'w')
+    creeper.url_log = open(os.path.join(log_dir, 'url.txt'), 'w')
+    creeper.email_log = open(os.path.join(log_dir, 'email.txt'), 'w')
+    creeper.log_writer = None
+
+    if is_background:
+        creeper.log_writer = creeper.LogWriter(
+            creeper.log_queue_size, creeper.log_batch_size)
+
+    seconds_list = []
+    start_time = datetime.now()
+
+    for entry in entry_list:
+        entry_time = datetime.now()
+        creeper.write_log(entry)
+        seconds_list.append((datetime.now() - entry_time).total_seconds())
+
+    if is_background:
+        creeper.log_writer.close()
+
+    for log_file in [creeper.debug_log, creeper.url_log, creeper.email_log]:
+        log_file.close()
+
+    total_seconds = (datetime.now() - start_time).total_seconds()
+    debug_size = os.path.getsize(os.path.join(log_dir, 'debug.txt'))
+    shutil.rmtree(log_dir)
+    seconds_list.sort()
+
+    return (sum(seconds_list) / len(seconds_list),
+            seconds_list[int(len(seconds_list) * 0.99)],
+            total_seconds,
+            debug_size)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=200000)
+    parser.add_argument('--source-kb', type=int, default=64)
+    parser.add_argument('--ndjson', action='store_true')
+    args = parser.parse_args()
+
+    creeper.is_ndjson_mode = args.ndjson
+    creeper.is_save_mode = True
+    creeper.is_scrape_mode = True
+    creeper.print_level = 0
+    creeper.redundancy_level = 1
+
+    print('{:<14} {:>18} {:>10} {:>10} {:>10} {:>10}'.format(
+        'writer', 'debug_source_size', 'mean us', 'p99 us', 'seconds',
+        'debug MB'))
+
+    for source_size in [None, creeper.debug_source_size]:
+        creeper.debug_source_size = source_size
+        entry_list = get_entry_list(args.entries, args.source_kb)
+
+        for is_background in [False, True]:
+            mean, p99, seconds, debug_size = get_write_seconds(
+                entry_list, is_background)
+
+            print('{:<14} {:>18} {:>10.2f} {:>10.2f} {:>10.3f} '
+                  '{:>10.1f}'.format(
+                      'background' if is_background else 'direct',
+                      str(source_size),
+                      mean * 10**6,
+                      p99 * 10**6,
+                      seconds,
+                      debug_size / 1024**2))
@@ -0,0 +1,88 @@
+# Creeper Benchmark: Near Duplicates
+# Pages fetched and pages/sec of a site whose links often carry a session
+# query, serving the same page under many URLs, with and without content
+# dedup, at each SimHash distance. A site without such links is crawled
+# too, where every copy found would be a false one. Each page answers after
+# --latency seconds, like a remote host
+# Usage: python benchmarks/near_duplicates.py [--alias-rate R]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def get_crawl_results(crawler, seed_url, config):
+    # Return seconds crawler takes on a job, and its pages and copies found
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([seed_url], config)
+
+    return (time.perf_counter() - start_time, creeper.page_count,
+            creeper.duplicate_count + creeper.near_duplicate_count,
+            sum(1 for check_link in creeper.duplicate_link_set
+                if check_link not in creeper.url_dict))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--alias-rate', type=float, default=0.3)
+    parser.add_argument('--words', type=int, default=300,
+                        help='Words of text of each page')
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--distance', type=int, nargs='+', default=[0, 3, 6])
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp()
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    crawler = creeper.Crawler()
+    config_dict = {'total_depth': args.depth + 2, 'print_level': 0,
+                   'is_concurrent_mode': True, 'is_save_mode': False}
+
+    print('{:<10} {:<10} {:>7} {:>7} {:>7} {:>9} {:>10}'.format(
+        'site', 'dedup', 'pages', 'copies', 'saved', 'seconds',
+        'pages/sec'))
+
+    for site_name, alias_rate in [('aliased', args.alias_rate),
+                                  ('plain', 0.0)]:
+        site = fixtures.SyntheticSite(args.pages, args.fan_out, args.depth,
+                                      slow_rate=1.0,
+                                      slow_seconds=args.latency,
+                                      alias_rate=alias_rate,
+                                      word_count=args.words)
+        seed_url = fixtures.get_url(
+            fixtures.get_started_server(fixtures.HTTPServer(site)))
+        run_list = [('off', creeper.CrawlConfig(**config_dict))]
+
+        for distance in args.distance:
+            run_list.append(('distance ' + str(distance), creeper.CrawlConfig(
+                is_content_dedup=True, simhash_distance=distance,
+                **config_dict)))
+
+        for dedup_name, config in run_list:
+            seconds, page_count, copy_count, saved_count = (
+                get_crawl_results(crawler, seed_url, config))
+
+            print('{:<10} {:<10} {:>7} {:>7} {:>7} {:>9.2f} {:>10.1f}'.format(
+                site_name, dedup_name, page_count, copy_count, saved_count,
+                seconds, page_count / seconds))
+
+    crawler.close()
+    shutil.rmtree(run_dir)
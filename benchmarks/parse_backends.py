@@ -0,0 +1,114 @@
+# Creeper Benchmark: Parse Backends
+# Parse time and peak memory of each get_attribute_list() backend
+# Usage: python benchmarks/parse_backends.py [corpus_dir] [--repeat N]
+
+from datetime import datetime
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+backend_list = ['lxml', 'html.parser', 'soup']
+corpus_url = 'http://example.org/page.html'  # Parent URL for every page
+
+
+def get_corpus(corpus_dir):  # Return raw bytes of every file in corpus_dir
+    corpus = []
+
+    for root, _, file_list in os.walk(corpus_dir):
+        for file_name in sorted(file_list):
+            with open(os.path.join(root, file_name), 'rb') as corpus_file:
+                corpus.append(corpus_file.read())
+
+    return corpus
+
+
+def get_synthetic_corpus(page_count, links_per_page):
+    # Return generated pages, for when no saved pages are passed
+    random.seed(0)
+    corpus = []
+
+    for i in range(page_count):
+        body = []
+
+        for j in range(links_per_page):
+            body.append('<p>' + 'lorem ipsum dolor sit amet ' * 8 + '</p>')
+            body.append('<a href="/section/' + str(random.randrange(10**6)) +
+                        '.html">Link ' + str(j) + '</a>')
+
+            if j % 10 == 0:
+                body.append('<img src="/img/' + str(j) + '.png">')
+
+        corpus.append(('<html><head><title>Page ' + str(i) +
+                       '</title><link href="/style.css"></head><body>' +
+                       '\n'.join(body) + '</body></html>').encode())
+
+    return corpus
+
+
+def get_peak_memory(corpus):  # Return highest traced allocation of one page
+    peak = 0
+
+    for code in corpus:
+        tracemalloc.start()
+        creeper.get_attribute_list(corpus_url, code)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return peak
+
+
+def get_parse_seconds(corpus, repeat):  # Return best time over the corpus
+    best = None
+
+    for _ in range(repeat):
+        start_time = datetime.now()
+
+        for code in corpus:
+            creeper.get_attribute_list(corpus_url, code)
+
+        seconds = (datetime.now() - start_time).total_seconds()
+
+        if best is None or seconds < best:
+            best = seconds
+
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus_dir', nargs='?',
+                        help='Directory of saved pages (default: generated)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--links', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.corpus_dir is not None:
+        corpus = get_corpus(args.corpus_dir)
+    else:
+        corpus = get_synthetic_corpus(args.pages, args.links)
+
+    corpus_bytes = sum(len(code) for code in corpus)
+    print('Corpus: ' + str(len(corpus)) + ' pages, ' +
+          str(round(corpus_bytes / 1024**2, 2)) + ' MB\n')
+    print('{:<12} {:>10} {:>10} {:>10} {:>14}'.format(
+        'backend', 'seconds', 'pages/sec', 'MB/sec', 'peak KB/page'))
+
+    for backend in backend_list:
+        creeper.parse_backend = backend
+        seconds = get_parse_seconds(corpus, args.repeat)
+        peak = get_peak_memory(corpus)
+
+        print('{:<12} {:>10.3f} {:>10.1f} {:>10.2f} {:>14.1f}'.format(
+            backend,
+            seconds,
+            len(corpus) / seconds,
+            corpus_bytes / 1024**2 / seconds,
+            peak / 1024))
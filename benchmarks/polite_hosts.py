@@ -0,0 +1,92 @@
+# Creeper Benchmark: Polite Hosts
+# Per-host request rates of a polite crawl of several local sites at once,
+# each under a port of its own, so a host of its own. The first asks for a
+# Crawl-delay in robots.txt, the others get --rate requests/sec. Intervals
+# are measured by the servers, between the page requests each gets
+# Usage: python benchmarks/polite_hosts.py [--hosts N] [--rate R]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def get_intervals(time_list):  # Return mean and least seconds apart
+    gap_list = [later - earlier
+                for earlier, later in zip(time_list, time_list[1:])]
+
+    if not gap_list:
+        return None, None
+
+    return sum(gap_list) / len(gap_list), min(gap_list)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=12)
+    parser.add_argument('--fan-out', type=int, default=3)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help='host_rate, requests/sec per host')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='host_burst, requests sent back to back')
+    parser.add_argument('--crawl-delay', type=int, default=1,
+                        help='Whole seconds the first host asks for')
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp()
+    seed_path = os.path.join(run_dir, 'seeds.txt')
+    server_list = []
+
+    with open(seed_path, 'w') as seed_file:
+        for seed in range(args.hosts):
+            site = fixtures.SyntheticSite(args.pages, args.fan_out,
+                                          args.depth, seed=seed)
+            server = fixtures.get_started_server(fixtures.HTTPServer(
+                site, crawl_delay=args.crawl_delay if seed == 0 else None))
+            server_list.append(server)
+            seed_file.write(fixtures.get_url(server) + '\n')
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    crawler = creeper.Crawler()
+    start_time = time.monotonic()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([], creeper.CrawlConfig(
+            total_depth=args.depth + 1, print_level=0,
+            is_concurrent_mode=True, is_save_mode=False,
+            is_polite_mode=True, host_rate=args.rate,
+            host_burst=args.burst, seed_file_path=seed_path,
+            max_active_seeds=args.hosts))
+
+    crawler.close()
+
+    print('{:<6} {:>9} {:>9} {:>10} {:>10} {:>10}'.format(
+        'host', 'requests', 'set s', 'mean s', 'least s', 'done at s'))
+
+    for index, server in enumerate(server_list):
+        time_list = server.request_time_list
+        mean, least = get_intervals(time_list)
+        target = (args.crawl_delay if server.crawl_delay is not None
+                  else 1 / args.rate)
+
+        print('{:<6} {:>9} {:>9.3f} {:>10} {:>10} {:>10.2f}'.format(
+            index, len(time_list), target,
+            '-' if mean is None else '{:.3f}'.format(mean),
+            '-' if least is None else '{:.3f}'.format(least),
+            time_list[-1] - start_time if time_list else 0))
+
+    shutil.rmtree(run_dir)
@@ -0,0 +1,89 @@
+# Creeper Benchmark: Revalidation
+# The same job run twice over a site whose pages carry an ETag and a
+# Last-Modified date, with and without the HTTP cache. On the second run
+# with it, unchanged pages come back as a 304 and are neither read nor
+# parsed. Each page answers after --latency seconds, like a remote host
+# Usage: python benchmarks/revalidation.py [--pages N] [--latency S]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def get_crawl_results(crawler, seed_url, config, server):
+    # Return seconds crawler takes on a job, and what the server sent
+    body_bytes, not_modified_count = (server.body_bytes,
+                                      server.not_modified_count)
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([seed_url], config)
+
+    return (time.perf_counter() - start_time,
+            server.body_bytes - body_bytes,
+            server.not_modified_count - not_modified_count)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--words', type=int, default=300,
+                        help='Words of text of each page')
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp()
+
+    for log_dir in ['1-debug', '2-url', '3-email', '4-phone', '6-cache']:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    creeper.cache_log_path = os.path.join(run_dir, 'logs', '6-cache',
+                                          'http_cache.sqlite')
+    site = fixtures.SyntheticSite(args.pages, args.fan_out, args.depth,
+                                  slow_rate=1.0, slow_seconds=args.latency,
+                                  word_count=args.words)
+    server = fixtures.get_started_server(fixtures.HTTPServer(site))
+    seed_url = fixtures.get_url(server)
+
+    print(('{:<6} {:<7} {:>6} {:>5} {:>5} {:>7} {:>8} {:>9} {:>8} '
+           '{:>10}').format('cache', 'run', 'pages', '304s', 'hits',
+                            'misses', 'KB sent', 'KB saved', 'seconds',
+                            'pages/sec'))
+
+    for cache_name, is_cache_mode in [('off', False), ('on', True)]:
+        crawler = creeper.Crawler(creeper.CrawlConfig(
+            total_depth=args.depth + 1, print_level=0,
+            is_concurrent_mode=True, is_save_mode=False,
+            is_cache_mode=is_cache_mode))
+
+        for run_name in ['first', 'second']:
+            seconds, body_bytes, not_modified_count = get_crawl_results(
+                crawler, seed_url, crawler.config, server)
+            http_cache = creeper.http_cache
+
+            print('{:<6} {:<7} {:>6} {:>5} {:>5} {:>7} {:>8.1f} {:>9.1f} '
+                  '{:>8.2f} {:>10.1f}'.format(
+                      cache_name, run_name, creeper.page_count,
+                      not_modified_count,
+                      getattr(http_cache, 'hit_count', 0),
+                      getattr(http_cache, 'miss_count', 0),
+                      body_bytes / 1024,
+                      getattr(http_cache, 'saved_bytes', 0) / 1024,
+                      seconds, creeper.page_count / seconds))
+
+        crawler.close()
+
+    shutil.rmtree(run_dir)
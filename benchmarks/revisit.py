@@ -0,0 +1,79 @@
+# Creeper Benchmark: Revisit Path
+# Time crawl() relogging already crawled URLs at redundancy_level 2
+# Usage: python benchmarks/revisit.py [--pages N] [--links N] [--depth N]
+
+from datetime import datetime
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+bench_domain = 'bench.example'
+relog_count = 0
+
+
+def count_write_log(entry):  # Count relogs, then log as usual
+    global relog_count
+
+    if getattr(entry, 'log_entry', None) == 'Already crawled':
+        relog_count += 1
+
+    write_log(entry)
+
+
+def set_crawled_site(page_count, links_per_page, depth):
+    # Fill url_dict as if every page was already crawled, nothing is fetched
+    random.seed(0)
+    creeper.url_dict.clear()
+    creeper.url_log_index = creeper.DedupIndex()
+
+    for i in range(page_count):
+        url = 'http://' + bench_domain + '/p' + str(i) + '.html'
+        record = creeper.URL(url, depth)
+        record.parsed_list = tuple(
+            'http://' + bench_domain + '/p' + str(j) + '.html'
+            for j in random.sample(range(1, page_count), links_per_page))
+        creeper.url_dict[creeper.get_check_link(url)] = record
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--links', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    creeper.is_save_mode = False
+    creeper.is_scrape_mode = False
+    creeper.print_level = 0
+    creeper.redundancy_level = 2
+    creeper.total_depth = args.depth
+    creeper.og_url = 'http://' + bench_domain + '/'
+    creeper.og_url_domain = bench_domain
+
+    write_log = creeper.write_log
+    creeper.write_log = count_write_log
+    best = None
+
+    for _ in range(args.repeat):
+        set_crawled_site(args.pages, args.links, args.depth)
+        relog_count = 0
+        start_time = datetime.now()
+
+        creeper.crawl(creeper.og_url + 'p0.html', args.depth)
+
+        seconds = (datetime.now() - start_time).total_seconds()
+
+        if best is None or seconds < best:
+            best = seconds
+
+    print('Relogs: ' + str(relog_count))
+    print('Seconds: ' + str(round(best, 3)))
+    print('Relogs/sec: ' + str(round(relog_count / best)))
+    print('Microseconds/relog: ' + str(round(best / relog_count * 10**6, 2)))
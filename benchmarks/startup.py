@@ -0,0 +1,102 @@
+# Creeper Benchmark: Startup
+# Cold start of a fresh interpreter importing creeper, and the time a small
+# job takes from the command line, against back to back in one Crawler
+# Usage: python benchmarks/startup.py [--repeat N] [--pages N]
+
+from contextlib import redirect_stdout
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, package_dir)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import creeper  # noqa: E402
+import fixtures  # noqa: E402
+
+
+log_dir_list = ['1-debug', '2-url', '3-email', '4-phone', '5-state',
+                '6-cache', '7-graph', '8-metrics']
+
+
+def get_cli_ms(seed_url, depth, run_dir):
+    # Return ms of a job run as its own creeper.py process
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(package_dir, 'creeper.py'),
+                    seed_url, '-d', str(depth), '-p', '0', '--no-save'],
+                   cwd=run_dir, stdout=subprocess.DEVNULL, check=True)
+
+    return (time.perf_counter() - start_time) * 1000
+
+
+def get_crawler_ms(crawler, seed_url):
+    # Return ms of a job run by crawler, which is kept between jobs
+    start_time = time.perf_counter()
+
+    with open(os.devnull, 'w') as null_file, redirect_stdout(null_file):
+        crawler.crawl([seed_url])
+
+    return (time.perf_counter() - start_time) * 1000
+
+
+def get_import_ms(run_dir):  # Return ms of a fresh interpreter importing
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import creeper'], cwd=run_dir,
+                   env=dict(os.environ, PYTHONPATH=package_dir), check=True)
+
+    return (time.perf_counter() - start_time) * 1000
+
+
+def get_python_ms(run_dir):  # Return ms of a fresh interpreter alone
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], cwd=run_dir, check=True)
+
+    return (time.perf_counter() - start_time) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=2)
+    args = parser.parse_args()
+
+    run_dir = tempfile.mkdtemp()
+
+    for log_dir in log_dir_list:
+        os.makedirs(os.path.join(run_dir, 'logs', log_dir))
+
+    site = fixtures.SyntheticSite(args.pages, depth=args.depth)
+    seed_url = fixtures.get_url(
+        fixtures.get_started_server(fixtures.HTTPServer(site)))
+
+    creeper.default_log_path = os.path.join(run_dir, 'logs') + '/'
+    crawler = creeper.Crawler(creeper.CrawlConfig(
+        total_depth=args.depth + 1, print_level=0, is_save_mode=False))
+    get_crawler_ms(crawler, seed_url)  # Pool and parser warm, like later
+
+    result_list = [
+        ('python', [get_python_ms(run_dir) for _ in range(args.repeat)]),
+        ('import creeper', [get_import_ms(run_dir)
+                            for _ in range(args.repeat)]),
+        ('job, CLI process', [get_cli_ms(seed_url, args.depth + 1, run_dir)
+                              for _ in range(args.repeat)]),
+        ('job, Crawler', [get_crawler_ms(crawler, seed_url)
+                          for _ in range(args.repeat)])]
+
+    crawler.close()
+    shutil.rmtree(run_dir)
+
+    print('Site: ' + str(site.page_count) + ' pages, ' +
+          str(args.repeat) + ' runs each\n')
+    print('{:<18} {:>10} {:>10}'.format('', 'median ms', 'min ms'))
+
+    for name, ms_list in result_list:
+        print('{:<18} {:>10.1f} {:>10.1f}'.format(
+            name, statistics.median(ms_list), min(ms_list)))
@@ -0,0 +1,115 @@
+# Creeper Benchmark: Text Scrape
+# Throughput of get_text_contact_list(), and what it adds to the parse time
+# Usage: python benchmarks/text_scrape.py [corpus_dir] [--repeat N]
+
+from datetime import datetime
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import creeper  # noqa: E402
+
+
+corpus_url = 'http://example.org/page.html'  # Parent URL for every page
+
+
+def get_best_seconds(function, corpus, repeat):
+    # Return best time of function over the corpus
+    best = None
+
+    for _ in range(repeat):
+        start_time = datetime.now()
+
+        for code in corpus:
+            function(code)
+
+        seconds = (datetime.now() - start_time).total_seconds()
+
+        if best is None or seconds < best:
+            best = seconds
+
+    return best
+
+
+def get_corpus(corpus_dir):  # Return raw bytes of every file in corpus_dir
+    corpus = []
+
+    for root, _, file_list in os.walk(corpus_dir):
+        for file_name in sorted(file_list):
+            with open(os.path.join(root, file_name), 'rb') as corpus_file:
+                corpus.append(corpus_file.read())
+
+    return corpus
+
+
+def get_synthetic_corpus(page_count, links_per_page, contact_interval):
+    # Return generated pages with a contact every contact_interval links
+    random.seed(0)
+    corpus = []
+
+    for i in range(page_count):
+        body = []
+
+        for j in range(links_per_page):
+            body.append('<p>' + 'lorem ipsum dolor sit amet ' * 8 + '</p>')
+            body.append('<a href="/section/' + str(random.randrange(10**6)) +
+                        '.html" class="nav-link">Link ' + str(j) + '</a>')
+
+            if j % contact_interval == 0:
+                body.append('<p>Write to staff' + str(j) + '@example.org ' +
+                            'or call (555) 010-' + str(1000 + j) + '</p>')
+                body.append('<img src="/img/logo@2x.png">')
+
+        corpus.append(('<html><head><title>Page ' + str(i) +
+                       '</title><link href="/style.css"></head><body>' +
+                       '\n'.join(body) + '</body></html>').encode())
+
+    return corpus
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus_dir', nargs='?',
+                        help='Directory of saved pages (default: generated)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--links', type=int, default=200)
+    parser.add_argument('--contact-interval', type=int, default=50)
+    args = parser.parse_args()
+
+    if args.corpus_dir is not None:
+        corpus = get_corpus(args.corpus_dir)
+    else:
+        corpus = get_synthetic_corpus(
+            args.pages, args.links, args.contact_interval)
+
+    corpus_mb = sum(len(code) for code in corpus) / 1024**2
+    contact_count = sum(len(creeper.get_text_contact_list(code))
+                        for code in corpus)
+    print('Corpus: ' + str(len(corpus)) + ' pages, ' +
+          str(round(corpus_mb, 2)) + ' MB, ' +
+          str(contact_count) + ' contacts in text\n')
+
+    scrape_seconds = get_best_seconds(
+        creeper.get_text_contact_list, corpus, args.repeat)
+
+    print('{:<12} {:>10} {:>10} {:>12}'.format(
+        'backend', 'MB/sec', '+scrape', 'overhead'))
+
+    for backend in ['lxml', 'html.parser']:
+        creeper.parse_backend = backend
+        parse_seconds = get_best_seconds(
+            lambda code: creeper.get_attribute_list(corpus_url, code),
+            corpus, args.repeat)
+
+        print('{:<12} {:>10.2f} {:>10.2f} {:>11.1f}%'.format(
+            backend,
+            corpus_mb / parse_seconds,
+            corpus_mb / (parse_seconds + scrape_seconds),
+            scrape_seconds / parse_seconds * 100))
+
+    print('\nText scrape: ' + str(round(corpus_mb / scrape_seconds, 1)) +
+          ' MB/sec')
@@ -2,12 +2,51 @@
 # A Cross-Platform Web Crawler and Scraper
 # Built in Python 3.9
 
-from bs4 import BeautifulSoup
-from copy import deepcopy
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from urllib import request
+from html.parser import HTMLParser
+from urllib import error, parse, request, robotparser
+import argparse
+import ast
+import asyncio
+import base64
+import bisect
+import codecs
+import ftplib
+import hashlib
+import heapq
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import socket
+import sqlite3
+import sys
+import threading
+import time
 import traceback
 import uuid
+import zlib
+
+try:  # Optional, br is only asked for when one of these can limit output
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# brotlicffi and brotli before 1.1 decode a whole chunk with no limit on its
+# output, so a small br body could expand without bound; those are not used
+if brotli is not None and not hasattr(brotli.Decompressor(),
+                                      'can_accept_more_data'):
+    brotli = None
 
 
 # Config Lists
@@ -17,6 +56,12 @@ disqualify_beginnings = ['mailto:',
                          'tel:'
                          ]  # Do not consider URL for crawling
 disqualify_endings = ['/LICENSE']  # Do NOT put '/' at the end
+disqualify_email_endings = ['.png',
+                            '.jpg',
+                            '.gif',
+                            '.svg',
+                            '.webp'
+                            ]  # i.e. 'logo@2x.png' in page text
 disqualify_url = [None,
                   '#']
 
@@ -42,23 +87,141 @@ qualify_tags = ['a',
 debug_log_divider = '=================================================='
 tab = '    '
 
-job_id = str(uuid.uuid4())
-timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
-
-debug_log_path = default_log_path + '1-debug/' + 'debug_' + timestamp + '.txt'
-url_log_path = default_log_path + '2-url/' + 'url_' + timestamp + '.txt'
-email_log_path = default_log_path + '3-email/' + 'email_' + timestamp + '.txt'
-phone_log_path = default_log_path + '4-phone/' + 'phone_' + timestamp + '.txt'
+state_log_dir = default_log_path + '5-state/'  # One '<JobID>.sqlite' per job
+cache_log_path = default_log_path + '6-cache/' + 'http_cache.sqlite'
+# JobID, timestamp, and the log paths named after them are set by set_job()
 
 
 # Defaults
+is_cache_mode = False  # Revalidate pages cached by earlier jobs
+canonical_cache_size = 100000  # Most recently used links kept canonical
+checkpoint_interval = 30  # Seconds between commits to the state store
+is_compact_dedup = False  # Bloom filter instead of an exact set of URLs
+is_concurrent_mode = False
+is_content_dedup = False  # Don't expand pages that copy one crawled before
+is_dns_cache = True  # Resolve each host once per dns_ttl, ahead of its pages
+is_graph_mode = False  # Export the link graph to graph_log_path
+is_keep_source = False  # Spill raw page sources to source_log_path, indexed
+is_metrics_mode = False  # Time each stage, export to metrics_log_path
+is_ndjson_mode = False  # Write logs as one JSON object per line
+is_persistent_mode = False  # Keep crawl state on disk, jobs can resume
+is_polite_mode = False  # Rate limit each host, honoring its Crawl-delay
 is_scrape_mode = True
 is_save_mode = True
+is_text_scrape_mode = False  # Also scrape emails and phones in page text
 print_level = 1
 redundancy_level = 0
 total_depth = 4
 
+debug_source_size = 1024  # Bytes of source in debug entries, None = all
+dedup_capacity = 10**6  # URLs per Bloom filter before it adds another
+crawl_priority = None  # Function of a URL, lower is crawled first at a depth
+dedup_error_rate = 0.001  # Chance a unique URL is taken as already logged
+dns_negative_ttl = 30  # Seconds a failed lookup is kept
+dns_resolvers = 4  # Threads resolving hosts ahead of their pages
+dns_ttl = 300  # Seconds a resolved host is kept
+graph_format = 'npy'  # CSR arrays as 'npy' files, or raw 'bin' files
+host_burst = 4  # Requests a host may get back to back in polite mode
+host_rate = 2.0  # Requests/sec per host in polite mode
+log_batch_size = 1000  # Entries log_writer writes at a time
+log_flush_interval = 1  # Seconds an entry may wait on a batch to fill
+log_queue_size = 10000  # Entries waiting on log_writer before it blocks
+max_body_size = 10 * 1024**2  # Bytes read of a page, the rest is cut off
+max_concurrency = 16  # Pages fetched at once in concurrent mode
+max_ftp_sessions = 4  # Logged in sessions open at once per FTP host
+max_idle_connections = 16  # Keep-alive connections kept open per host
+max_active_seeds = 64  # Seeds crawled at once in bulk mode
+max_redirects = 10
+metrics_interval = 5  # Seconds between exports of metrics
+metrics_output = 'file'  # Prometheus text 'file', or 'status' line
+parse_backend = 'lxml'  # 'lxml' or 'html.parser' stream, 'soup' is a tree
+parse_chunk_size = 65536  # Bytes fed to the streaming backends at a time
+parse_processes = 0  # Parse worker processes in concurrent mode, 0 = none
+seed_file_path = None  # Seeds to crawl in bulk, a 'URL [depth]' per line
+seed_page_budget = None  # Pages fetched per seed in bulk mode, None = all
+simhash_distance = 3  # Bits of 64 a near duplicate's SimHash differs in
+store_cache_size = 10000  # Stored values kept in memory per StoreDict
 timeout = 20
+worker_count = 0  # Processes of a distributed crawl, split by host, 0 = none
+worker_poll_interval = 0.05  # Seconds a worker waits on an empty frontier
+
+# Defaults a CrawlConfig can set, each job of a Crawler sets all of them
+config_key_list = ['is_cache_mode', 'canonical_cache_size',
+                   'checkpoint_interval', 'is_compact_dedup',
+                   'is_concurrent_mode', 'is_content_dedup',
+                   'is_dns_cache', 'is_graph_mode', 'is_keep_source',
+                   'is_metrics_mode', 'is_ndjson_mode', 'is_persistent_mode',
+                   'is_polite_mode', 'is_scrape_mode', 'is_save_mode',
+                   'is_text_scrape_mode', 'print_level', 'redundancy_level',
+                   'total_depth', 'debug_source_size',
+                   'dedup_capacity', 'crawl_priority', 'dedup_error_rate',
+                   'dns_negative_ttl', 'dns_resolvers', 'dns_ttl',
+                   'graph_format',
+                   'host_burst', 'host_rate', 'log_batch_size',
+                   'log_flush_interval', 'log_queue_size', 'max_body_size',
+                   'max_active_seeds', 'max_concurrency', 'max_ftp_sessions',
+                   'max_idle_connections', 'max_redirects',
+                   'metrics_interval', 'metrics_output', 'parse_backend',
+                   'parse_chunk_size', 'parse_processes', 'seed_file_path',
+                   'seed_page_budget', 'simhash_distance',
+                   'store_cache_size', 'timeout',
+                   'worker_count', 'worker_poll_interval']
+default_config_dict = {key: globals()[key] for key in config_key_list}
+
+# Config get_attribute_list() reads, set in each parse_executor process
+parse_config_key_list = ['disqualify_email_endings', 'is_scrape_mode',
+                         'is_text_scrape_mode', 'parse_backend',
+                         'parse_chunk_size', 'parse_processes',
+                         'qualify_attributes', 'qualify_endings',
+                         'qualify_tags']
+
+
+accept_encodings = ['gzip', 'deflate'] + (['br'] if brotli else [])
+http_headers = {'User-Agent': 'Python-urllib/' + request.__version__,
+                'Accept-Encoding': ', '.join(accept_encodings)}
+html_content_types = ['text/html', 'application/xhtml+xml']  # Bodies read
+redirect_codes = [301, 302, 303, 307, 308]
+dns_stat_key_list = ['hit_count', 'miss_count', 'failed_count',
+                     'prefetch_count', 'resolve_seconds',
+                     'wait_seconds']  # Counted per job, summed over workers
+
+metrics_bucket_dict = {'stage': [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05,
+                                 0.1, 0.5, 1, 5, 10],  # Seconds
+                       'page': [1024, 4096, 16384, 65536, 262144, 1048576,
+                                4194304]}  # Bytes, upper bounds
+metrics_name_dict = {'stage': 'stage_seconds',
+                     'page': 'page_bytes'}  # Histogram names, exported
+
+default_port_dict = {'http://': ':80',
+                     'https://': ':443',
+                     'ftp://': ':21'}  # Dropped from hosts
+join_schemes = ['http', 'https', 'ftp', 'ftps']  # Absolute when merging
+bit_table_list = [bytes((i >> bit) & 1 for i in range(256))
+                  for bit in range(8)]  # Byte to its bit N, for SimHash
+
+charset_pattern = re.compile(rb'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+back_link_pattern = re.compile(r'(\.\./)*')
+host_pattern = re.compile(r'[^/?#]*')
+# Text scraping finds the '@' and '-1234' anchors first, then looks back
+# Any group of a phone may follow a '-', '.' or ' ', i.e. '555.123 4567'
+# Those are all folded to '-', and digits to '0', so phone_pattern is a
+# literal search, as the spaces of text would make a class of them slow
+email_pattern = re.compile(
+    rb'@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}')
+email_local_chars = (b'abcdefghijklmnopqrstuvwxyz'
+                     b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_.%+-')
+phone_fold_table = bytes.maketrans(b'0123456789. ', b'0000000000--')
+phone_pattern = re.compile(rb'0-0000(?!0)')  # Of code folded by the table
+phone_tail_pattern = re.compile(rb'[\w-]|\.\d')  # What may not follow it
+phone_head_pattern = re.compile(
+    rb'(?<![\w+.-])(?:\+1[-. ]?)?(?:\(\d{3}\) ?|\d{3}[-. ])\d{3}$')
+# FTP listing lines, name is the last group: MLSD, then Unix and DOS LIST
+ftp_mlsd_pattern = re.compile(rb'((?:[\w.-]+=[^;]*;)+) (.+)')
+ftp_unix_pattern = re.compile(
+    rb'[-dlbcps][-rwxsStTl]{9}\S*\s+\d+\s+\S+\s+(?:\S+\s+)?\d+\s+'
+    rb'\w{3}\s+\d{1,2}\s+(?:\d{4}|\d{1,2}:\d{2})\s(.+)')
+ftp_dos_pattern = re.compile(
+    rb'\d{2}-\d{2}-\d{2,4}\s+\d{1,2}:\d{2}\s*[AP]M\s+(?:<DIR>|\d+)\s+(.+)')
 
 
 # Error Codes
@@ -68,26 +231,503 @@ code_too_many_back_links = 1
 
 # Storage Lists/Dicts
 url_dict = {}  # Checklink is key, URL class is value
-email_list = []
-phone_list = []
+email_list = []  # Print outputs, in the order found
+phone_list = []  # Print outputs, in the order found
 
-prefix_cache_dict = {}  # Key = URL, value = prefix
-url_log_list = []  # Used for seeing if URL has been logged yet
+prefetch_dict = {}  # Checklink is key, URL class fetched ahead is value
+canonical_cache_dict = OrderedDict()  # (URL, base URL) key, LRU order
+seed_budget_dict = {}  # Seed URL is key, pages it may still fetch is value
+duplicate_link_set = set()  # Checklinks of links copies were not expanded to
 
 
 # Blanks
+canonical_hit_count = 0
+canonical_miss_count = 0
 debug_count = 0
+duplicate_count = 0
 error_count = 0
+near_duplicate_count = 0
+page_count = 0
+resumed_count = 0
+seed_count = 0
+decoded_bytes = 0
+skipped_count = 0
+truncated_count = 0
+wire_bytes = 0
 
 job_stats = ''
 og_url = ''
 og_url_domain = ''
 
+connection_pool = None
+content_index = None
+dns_cache = None
+email_index = None
 email_log = None
+fetch_executor = None
+graph_writer = None
+host_scheduler = None
+http_cache = None
+log_writer = None
+metrics = None
+parse_executor = None
+shared_config_dict = {}  # Config each of what run_job() keeps was built with
 url_input_list = None
 url_log = None
+phone_index = None
+page_store = None
 phone_log = None
+source_index_log = None
+source_log = None
 start_time = None
+url_log_index = None  # Used for seeing if URL has been logged yet
+
+
+class BodyReader:
+    # Reads a response body in chunks, undoing gzip, deflate or br as it goes
+    # A read() decodes about size bytes at most
+    def __init__(self, response, content_encoding=None):
+        self.response = response
+        self.encoding = (content_encoding or '').strip().lower()
+        self.decompressor = None
+        self.is_done = False
+        self.tail = b''  # Read from response, not decoded yet
+        self.wire_size = 0  # Bytes read from response
+
+        if self.encoding in ['gzip', 'x-gzip']:
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.encoding == 'deflate':
+            self.decompressor = zlib.decompressobj()
+        elif self.encoding == 'br' and brotli is not None:
+            self.decompressor = brotli.Decompressor()
+
+    def get_brotli_output(self, size):  # Return br output of tail, up to size
+        data, self.tail = self.tail, b''
+
+        return self.decompressor.process(data, output_buffer_limit=size)
+
+    def get_inflated(self, size):  # Return zlib output of tail, up to size
+        try:
+            chunk = self.decompressor.decompress(self.tail, size)
+        except zlib.error:
+            if self.encoding != 'deflate' or self.wire_size > len(self.tail):
+                raise
+
+            # Some servers send deflate without the zlib header
+            self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            chunk = self.decompressor.decompress(self.tail, size)
+
+        self.tail = self.decompressor.unconsumed_tail
+
+        return chunk
+
+    def is_holding(self):  # Whether br has output left from earlier input
+        return (self.encoding == 'br' and self.decompressor is not None
+                and not self.decompressor.can_accept_more_data())
+
+    def read(self, size):  # Return up to size decoded bytes, b'' at the end
+        while not self.is_done:
+            if not self.tail and not self.is_holding():
+                self.tail = self.response.read(
+                    parse_chunk_size if self.decompressor is not None
+                    else min(parse_chunk_size, size))
+                self.wire_size += len(self.tail)
+
+                if not self.tail:
+                    self.is_done = True
+
+                    if self.encoding == 'br' or self.decompressor is None:
+                        return b''
+
+                    return self.decompressor.flush()
+
+            if self.decompressor is None:  # Not encoded, or can't be undone
+                chunk, self.tail = self.tail, b''
+            elif self.encoding == 'br':
+                chunk = self.get_brotli_output(size)
+            else:
+                chunk = self.get_inflated(size)
+
+            if chunk:
+                return chunk
+
+        return b''
+
+
+class BloomFilter:
+    # Fixed capacity set that can only answer 'maybe' or 'no'
+    __slots__ = ('bits', 'bit_count', 'hash_count', 'capacity', 'count')
+
+    def __init__(self, capacity, error_rate):
+        self.bit_count = max(8, int(
+            -capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(
+            self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.capacity = capacity
+        self.count = 0
+
+    def add(self, key_hash):  # Return True if key was not in the filter yet
+        bits = self.bits
+        is_new = False
+
+        for position in self.get_positions(key_hash):
+            mask = 1 << (position & 7)
+
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                is_new = True
+
+        self.count += is_new
+
+        return is_new
+
+    def get_positions(self, key_hash):  # Double hashing over one digest
+        first, second = key_hash
+        bit_count = self.bit_count
+
+        return [(first + i * second) % bit_count
+                for i in range(self.hash_count)]
+
+    def has_key(self, key_hash):
+        bits = self.bits
+
+        for position in self.get_positions(key_hash):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+
+        return True
+
+
+class CanonicalURL:
+    # Every form of a link crawl() needs, worked out in a single pass
+    __slots__ = ('url', 'prefix', 'bare_url', 'check_link', 'domain',
+                 'has_prefix')
+
+    def __init__(self, url):
+        url = parse.urldefrag(url.replace(' ', ''))[0]  # Never sent anyway
+        self.has_prefix = True
+
+        if is_qualified_email(url) or is_qualified_phone(url):
+            self.prefix = ''
+            rest = url
+        elif '//' in url and not url.startswith('//'):
+            index = url.find('//') + 2
+            self.prefix = url[:index].lower()
+            rest = url[index:]
+        else:
+            self.has_prefix = False
+            self.prefix = 'http://'  # Default to this prefix if none
+            rest = url[2:] if url.startswith('//') else url
+
+        # Split host from path, only the host is folded
+        host_end = host_pattern.match(rest).end()
+        domain = rest[:host_end].lower()
+        path = rest[host_end:]
+        query_index = path.find('?')
+
+        if query_index == -1:
+            path = get_resolved_path(path)
+        else:
+            path = get_resolved_path(path[:query_index]) + path[query_index:]
+
+        default_port = default_port_dict.get(self.prefix)
+
+        if domain.startswith('www.'):
+            domain = domain[4:]
+
+        if default_port is not None and domain.endswith(default_port):
+            domain = domain[:-len(default_port)]
+
+        if path.endswith('/'):
+            path = path[:-1]
+
+        if self.prefix == '':  # Email or phone, nothing to fold
+            domain, path = rest, ''
+
+        self.domain = domain
+        self.bare_url = domain + path
+        self.url = self.prefix + self.bare_url
+
+        if self.prefix.startswith('http'):
+            self.check_link = 'http://' + self.bare_url
+        elif self.prefix.startswith('ftp'):
+            self.check_link = 'ftp://' + self.bare_url
+        else:
+            self.check_link = self.bare_url
+
+
+class ConnectionPool:
+    # Keep-alive HTTP(S) connections, reused per (scheme, host, port), and
+    # logged in FTP(S) sessions, per (scheme, host, port, user, password)
+    def __init__(self, max_idle):
+        self.max_idle = max_idle  # Idle connections kept per host
+        self.idle_dict = {}  # Host key is key, idle connection list is value
+        self.slot_dict = {}  # Host key is key, semaphore is value
+        self.lock = threading.Lock()  # Shared by crawl_async() threads
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def close(self):
+        with self.lock:
+            for idle_list in self.idle_dict.values():
+                for connection in idle_list:
+                    connection.close()
+
+            self.idle_dict = {}
+
+    def get_connection(self, host_key):
+        # Return an idle connection to the host if there is one
+        with self.lock:
+            idle_list = self.idle_dict.get(host_key)
+
+            if idle_list:
+                self.hit_count += 1
+
+                return idle_list.pop(), True
+
+            self.miss_count += 1
+
+        return self.get_new_connection(host_key), False
+
+    def get_new_connection(self, host_key):
+        scheme, host, port = host_key[:3]
+
+        if scheme in ['ftp', 'ftps']:
+            return get_ftp_session(host_key)
+
+        proxy = get_proxy(scheme, host)
+        proxy_header_dict = {}
+
+        if proxy is not None and proxy.username is not None:
+            credentials = (parse.unquote(proxy.username) + ':' +
+                           parse.unquote(proxy.password or ''))
+            proxy_header_dict['Proxy-Authorization'] = (
+                'Basic ' + base64.b64encode(credentials.encode()).decode())
+
+        if proxy is None and scheme == 'https':
+            connection = http.client.HTTPSConnection(
+                host, port, timeout=timeout)
+        elif proxy is None:
+            connection = http.client.HTTPConnection(
+                host, port, timeout=timeout)
+        elif scheme == 'https':  # Tunneled by a CONNECT, as urlopen() does
+            connection = http.client.HTTPSConnection(
+                proxy.hostname, proxy.port, timeout=timeout)
+            connection.set_tunnel(host, port, headers=proxy_header_dict)
+        else:
+            connection = http.client.HTTPConnection(
+                proxy.hostname, proxy.port, timeout=timeout)
+
+        # Headers of a plain HTTP proxy, which is sent the whole URL
+        connection.proxy_header_dict = (proxy_header_dict
+                                        if proxy is not None
+                                        and scheme != 'https' else None)
+
+        if dns_cache is not None or metrics is not None:
+            connection._create_connection = get_resolved_socket
+
+        return connection
+
+    def get_slot(self, host_key, size):
+        # Return semaphore that keeps the host to size connections at once
+        with self.lock:
+            if host_key not in self.slot_dict:
+                self.slot_dict[host_key] = threading.BoundedSemaphore(size)
+
+            return self.slot_dict[host_key]
+
+    def put_connection(self, host_key, connection):
+        # Keep the connection for the next request, unless the host is full
+        with self.lock:
+            idle_list = self.idle_dict.setdefault(host_key, [])
+
+            if len(idle_list) < self.max_idle:
+                idle_list.append(connection)
+
+                return
+
+        connection.close()
+
+
+class Response:
+    # Result of get_code(), headers are empty for FTP and failed requests
+    __slots__ = ('code', 'status', 'headers', 'is_skipped', 'is_truncated',
+                 'wire_size')
+
+    def __init__(self, code, status, headers=None,
+                 is_skipped=False, is_truncated=False, wire_size=0):
+        self.code = code  # Decoded, if it came compressed
+        self.status = status
+        self.headers = headers if headers is not None else {}
+        self.is_skipped = is_skipped  # Not HTML, so the body was not read
+        self.is_truncated = is_truncated  # Cut off at max_body_size
+        self.wire_size = wire_size  # Bytes of body read off the connection
+
+
+class SQLiteStore:
+    # SQLite file in WAL mode, committed every checkpoint_interval seconds
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+
+        self.checkpoint_time = datetime.now()
+
+    def checkpoint(self, is_forced=False):
+        # Commit at most every checkpoint_interval seconds unless forced
+        seconds = (datetime.now() - self.checkpoint_time).total_seconds()
+
+        if is_forced or seconds >= checkpoint_interval:
+            self.connection.commit()
+            self.checkpoint_time = datetime.now()
+
+    def close(self):
+        self.checkpoint(True)
+        self.connection.close()
+
+
+class ContentIndex:
+    # Fingerprints of the pages crawled so far, so copies of them are found
+    # Exact copies by content hash, near ones by SimHash, taken as copies
+    # when at most distance of their 64 bits differ. The bits are split in
+    # distance + 1 bands, of which near copies share at least one whole,
+    # so only pages sharing a band with the page are compared to it
+    def __init__(self, distance):
+        self.distance = distance
+        self.hash_dict = {}  # Content hash is key, URL is value
+        self.band_list = []  # (shift, mask) of each band
+        self.band_dict_list = []  # Band is key, [(SimHash, URL)] is value
+
+        for i in range(distance + 1):
+            start = 64 * i // (distance + 1)
+            end = 64 * (i + 1) // (distance + 1)
+            self.band_list.append((start, (1 << (end - start)) - 1))
+            self.band_dict_list.append({})
+
+    def add(self, url, content_hash, simhash):
+        # Return (URL it copies, True if exactly), or None if not a copy,
+        # in which case url is added as an original
+        original_url = self.hash_dict.get(content_hash)
+
+        if original_url is not None:
+            return original_url, True
+
+        if simhash is not None:
+            for (shift, mask), band_dict in zip(self.band_list,
+                                                self.band_dict_list):
+                for other_simhash, other_url in band_dict.get(
+                        (simhash >> shift) & mask, ()):
+                    if bin(simhash ^ other_simhash).count('1') <= (
+                            self.distance):  # int.bit_count() is 3.10+
+                        return other_url, False
+
+        self.hash_dict[content_hash] = url
+
+        if simhash is not None:
+            for (shift, mask), band_dict in zip(self.band_list,
+                                                self.band_dict_list):
+                band_dict.setdefault((simhash >> shift) & mask, []).append(
+                    (simhash, url))
+
+        return None
+
+
+class CrawlConfig:
+    # Settings of a Crawler job, by the names in config_key_list
+    # Those not passed keep the value they had when creeper was imported
+    def __init__(self, **config_dict):
+        unknown_list = sorted(set(config_dict) - set(config_key_list))
+
+        if unknown_list:
+            raise TypeError('Unknown config: ' + ', '.join(unknown_list))
+
+        self.__dict__.update(default_config_dict, **config_dict)
+
+    def get_dict(self):
+        return {key: getattr(self, key) for key in config_key_list}
+
+
+class Crawler:
+    # Runs crawl jobs one after another in this process, without prompts
+    # Jobs share the connection pool, HTTP cache and executors until close()
+    # The crawl state is module wide, so run one Crawler at a time
+    def __init__(self, config=None):
+        self.config = config if config is not None else CrawlConfig()
+
+    def close(self):
+        close_shared()
+
+    def crawl(self, url_list, config=None):  # Return job stats of the crawl
+        set_crawl_config((config or self.config).get_dict())
+        set_job()
+
+        return run_job(list(url_list))
+
+    def resume(self, job_id, config=None):
+        # Crawl what is left of persistent job job_id, with its stored seeds
+        if not os.path.isfile(state_log_dir + job_id + '.sqlite'):
+            raise ValueError('No crawl state for JobID ' + job_id)
+
+        set_crawl_config(dict((config or self.config).get_dict(),
+                              is_persistent_mode=True))
+        set_job(job_id)
+
+        return run_job(None, True)
+
+
+class CrawlStore(SQLiteStore):
+    # SQLite state of one job, kept by job_id so the job can be resumed
+    def __init__(self, path):
+        super().__init__(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS job '
+            '(key TEXT PRIMARY KEY, value TEXT)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS item '
+            '(name TEXT, key TEXT, value BLOB, PRIMARY KEY (name, key)) '
+            'WITHOUT ROWID')
+        self.set_frontier()
+        self.connection.commit()
+
+    def clear_frontier(self):
+        self.connection.execute('DELETE FROM frontier')
+
+    def get_config(self):  # Return config the job was started with
+        return {key: json.loads(value) for key, value in
+                self.connection.execute('SELECT key, value FROM job')}
+
+    def get_resumed(self):
+        # Prepare the store for a restart and return stored page count
+        # Every page fetched before is handed back to crawl() as prefetched,
+        # so the tree is logged again in full without fetching them again
+        self.connection.execute(
+            'UPDATE OR REPLACE item SET name = ? WHERE name = ?',
+            ('prefetch', 'url'))
+        self.connection.execute('DELETE FROM item WHERE name = ?', ('depth',))
+        self.clear_frontier()
+        self.connection.commit()
+
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM item WHERE name = ?',
+            ('prefetch',)).fetchone()[0]
+
+    def set_config(self, config_dict):
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO job VALUES (?, ?)',
+            [(key, json.dumps(value)) for key, value in config_dict.items()])
+        self.connection.commit()
+
+    def set_frontier(self):  # Rebuilt on every run, like its table
+        self.connection.execute('DROP TABLE IF EXISTS frontier')
+        self.connection.execute(
+            'CREATE TABLE frontier (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'host TEXT, depth INTEGER, priority REAL, value BLOB)')
+        self.connection.execute(
+            'CREATE INDEX frontier_order ON frontier '
+            '(host, depth DESC, priority, id)')
 
 
 class DebugError:
@@ -120,6 +760,15 @@ class DebugError:
 
         return output
 
+    def get_json_output(self):
+        return {'entry': debug_count,
+                'error': self.code,
+                'message': self.message,
+                'url': self.url,
+                'exception': None if self.exception is None
+                else str(self.exception),
+                'traceback': self.traceback}
+
     def get_print_output(self):
         output = ('Entry#' + str(debug_count) +
                   ' | ERROR_' + str(self.code) + ': ' +
@@ -155,6 +804,13 @@ class DebugInfo:
 
         return output
 
+    def get_json_output(self):
+        return {'entry': debug_count,
+                'info': self.header,
+                'url': self.url,
+                'subheader': self.subheader,
+                'body': self.body}
+
     def get_print_output(self):
         output = ('Entry#' + str(debug_count) + ' | INFO: ' + self.header)
 
@@ -164,491 +820,3076 @@ class DebugInfo:
         return output
 
 
-class Email:
-    def __init__(self, email, log_entry=None):
-        self.email = get_stripped_email(email)
-        self.log_entry = log_entry
+class DedupIndex:
+    # Keys seen so far, O(1) lookups either way
+    # Exact set by default, or Bloom filters that double in capacity as
+    # they fill, each at half the error rate of the last
+    def __init__(self, is_compact=False):
+        self.is_compact = is_compact
+        self.key_set = set()
+        self.filter_list = []
 
-    def get_log_output(self):
-        return self.email
+        if is_compact:
+            self.filter_list.append(
+                BloomFilter(dedup_capacity, dedup_error_rate / 2))
 
-    def get_print_output(self):
-        if self.log_entry is not None:
-            return self.email + ' | ' + self.log_entry
+    def __contains__(self, key):
+        if not self.is_compact:
+            return key in self.key_set
 
-        return self.email
+        key_hash = get_key_hash(key)
 
+        return any(u.has_key(key_hash) for u in self.filter_list)
 
-class Phone:
-    def __init__(self, phone, log_entry=None):
-        self.phone = get_stripped_phone(phone)
-        self.log_entry = log_entry
+    def __len__(self):
+        if not self.is_compact:
+            return len(self.key_set)
 
-    def get_log_output(self):
-        return self.phone
+        return sum(u.count for u in self.filter_list)
 
-    def get_print_output(self):
-        if self.log_entry is not None:
-            return self.phone + ' | ' + self.log_entry
+    def add(self, key):  # Return True if key was not in the index yet
+        if not self.is_compact:
+            if key in self.key_set:
+                return False
 
-        return self.phone
+            self.key_set.add(key)
 
+            return True
 
-class URL:
-    def __init__(self, url, depth, log_entry=None, source=None):
-        self.url = url
-        self.depth = depth  # Current, not total, depth level
-        self.log_entry = log_entry
-        self.source = str(source)  # Never let this be a soup, always str
-        self.log_url = get_rebuilt_link(url)
+        key_hash = get_key_hash(key)
 
-        # Blank squad
-        self.parsed_list = []
+        for u in self.filter_list:
+            if u.has_key(key_hash):
+                return False
 
-    def get_log_output(self):
-        if redundancy_level != 0:
-            indent = tab * (total_depth - self.depth)
-        else:
-            indent = ''
+        last_filter = self.filter_list[-1]
 
-        return indent + self.log_url
+        if last_filter.count >= last_filter.capacity:
+            last_filter = BloomFilter(
+                last_filter.capacity * 2,
+                dedup_error_rate / 2 ** (len(self.filter_list) + 1))
+            self.filter_list.append(last_filter)
 
-    def get_print_output(self):
-        if redundancy_level != 0:
-            indent = tab * (total_depth - self.depth)
-        else:
-            indent = ''
+        return last_filter.add(key_hash)
 
-        if self.log_entry is not None:
-            return indent + self.log_url + ' | ' + self.log_entry
+    def get_memory_size(self):  # Return bytes held, keys included
+        if not self.is_compact:
+            return (sys.getsizeof(self.key_set) +
+                    sum(sys.getsizeof(key) for key in self.key_set))
 
-        return indent + self.log_url
+        return sum(sys.getsizeof(u.bits) for u in self.filter_list)
 
 
-def crawl(current_url, current_depth):
-    current_url = get_rebuilt_link(current_url)
-    current_check_link = get_check_link(current_url)
-    has_crawled = current_check_link in url_dict
+class DNSCache:
+    # Addresses of each host, shared by the fetch threads, kept dns_ttl
+    # seconds, and failed lookups, kept dns_negative_ttl seconds
+    # getaddrinfo() gives no TTL of its own, so both are set by config
+    # prefetch() resolves a host on the resolver pool while its pages wait
+    # in the frontier, and a fetch of a host still being resolved waits on
+    # that lookup instead of starting its own
+    def __init__(self, resolver_count):
+        self.entry_dict = {}  # Host is key, [future, expiry time] is value
+        self.executor = ThreadPoolExecutor(max_workers=resolver_count)
+        self.lock = threading.Lock()
 
-    if current_depth > 0 and not has_crawled:
-        current_soup = get_soup(current_url)
-        url_class = URL(current_url, current_depth, None, current_soup)
-        current_crawl_job, url_dict[current_check_link] = url_class, url_class
-        has_qualified_attributes = False
-        tag_list = get_tag_list(current_url, current_soup)
+        self.hit_count = 0
+        self.miss_count = 0
+        self.failed_count = 0  # Fetches given a failed lookup
+        self.prefetch_count = 0
+        self.resolve_seconds = 0  # Spent resolving, on any thread
+        self.wait_seconds = 0  # Spent by fetches waiting on a lookup
 
-        if (is_beta_url(current_url, current_depth)
-                and is_qualified_crawl_url(current_url)):
-            current_crawl_job.log_entry = 'Crawling...'
+    def close(self):  # Lookups underway are left to finish on their own
+        self.executor.shutdown(wait=False)
 
-        write_log(current_crawl_job)
+    def get_address_list(self, host):
+        # Return getaddrinfo() of host, raises what a failed lookup raised
+        wait_time = time.perf_counter()
+        future, is_new = self.get_future(host)
 
-        for tag in tag_list:  # Update parsed lists before crawling them
-            parsed_url = get_parsed_attribute(current_url, tag)
+        if is_new:  # Resolved on this thread, as it would wait anyway
+            self.resolve(host, future)
 
-            if parsed_url is not None:
-                has_qualified_attributes = True
+        try:
+            return future.result()
+        except Exception:
+            with self.lock:
+                self.failed_count += 1
 
-            if parsed_url in disqualify_url:
-                continue  # Barrier to prevent processing None, etc.
+            raise
+        finally:
+            with self.lock:
+                self.wait_seconds += time.perf_counter() - wait_time
 
-            # Merge path with domain if the URL is missing domain
-            if (not has_prefix(parsed_url)
-                    and not is_qualified_email(parsed_url)
-                    and not is_qualified_phone(parsed_url)):
-                parsed_url = get_merged_url(current_url, parsed_url)
+    def get_future(self, host, is_prefetch=False):
+        # Return (future of the lookup of host, True if the caller is to
+        # resolve it), a new one if there is none or it expired
+        now = time.monotonic()
 
-            # Add to URL class for preserving tree structure
-            if parsed_url not in current_crawl_job.parsed_list:
-                current_crawl_job.parsed_list.append(parsed_url)
-            else:
-                continue
+        with self.lock:
+            entry = self.entry_dict.get(host)
 
-        url_dict[current_check_link].parsed_list = deepcopy(
-            current_crawl_job.parsed_list)
+            if entry is not None and (entry[1] is None or entry[1] > now):
+                if not is_prefetch:
+                    self.hit_count += 1
 
-        for parsed_url in current_crawl_job.parsed_list:  # Crawl parsed lists
-            bare_parsed_url = get_stripped_url(parsed_url)
+                return entry[0], False
 
-            if (current_depth > 1
-                    and is_qualified_crawl_url(parsed_url)
-                    and bare_parsed_url.startswith(og_url_domain)
-                    and bare_parsed_url != get_stripped_url(og_url)):
-                # Crawl if current_depth allows it, and on og domain
-                crawl(parsed_url, current_depth - 1)
+            future = Future()
+            self.entry_dict[host] = [future, None]  # Expires once resolved
+
+            if is_prefetch:
+                self.prefetch_count += 1
             else:
-                if (not is_qualified_email(parsed_url)
-                        and not is_qualified_phone(parsed_url)):
-                    write_log(URL(parsed_url, current_depth - 1))
-                elif is_qualified_email(parsed_url):
-                    write_log(Email(parsed_url))
-                elif is_qualified_phone(parsed_url):
-                    write_log(Phone(parsed_url))
-
-        if not has_qualified_attributes:
-            debug_header = 'No attributes detected'
-            debug_subheader = ('The tags were parsed from the URL, ' +
-                               'but no qualified attributes were detected')
-            debug_body = 'SOURCE:\n\n' + str(current_crawl_job.source)
-
-            write_log(DebugInfo(current_crawl_job.url,
-                                debug_header,
-                                debug_subheader,
-                                debug_body))
-    elif current_depth > 0:  # URL has already been crawled, get the result
-        is_higher_depth = (
-            current_depth > url_dict[get_check_link(current_url)].depth)
+                self.miss_count += 1
 
-        # If current_depth is greater than when we last crawled this URL,
-        # update the depth so we don't recrawl at anything equal to or less
-        if (is_higher_depth):
-            url_dict[current_check_link].depth = current_depth
+            return future, True
 
-        if is_higher_depth or redundancy_level == 2:
-            current_relog_job = deepcopy(url_dict[current_check_link])
-            current_relog_job.depth = current_depth
-            current_relog_job.log_entry = 'Already crawled'
+    def prefetch(self, host):  # Resolve host on the pool, if not known yet
+        future, is_new = self.get_future(host, True)
 
-            write_log(current_relog_job)
+        if is_new:
+            self.executor.submit(self.resolve, host, future)
 
-            for item in current_relog_job.parsed_list:
-                bare_item_url = get_stripped_url(item)
+    def resolve(self, host, future):  # Look up host, keeping the result
+        span_time = time.perf_counter()
 
-                if (current_depth > 1
-                        and is_qualified_crawl_url(item)
-                        and bare_item_url.startswith(og_url_domain)
-                        and bare_item_url != get_stripped_url(og_url)):
-                    # Crawl if current_depth allows it, and on og domain
-                    crawl(item, current_depth - 1)
-                else:
-                    if (not is_qualified_email(item)
-                            and not is_qualified_phone(item)):
-                        write_log(URL(item, current_depth - 1))
-                    elif is_qualified_email(item):
-                        write_log(Email(item))
-                    elif is_qualified_phone(item):
-                        write_log(Phone(item))
+        try:
+            address_list = socket.getaddrinfo(
+                host, None, type=socket.SOCK_STREAM)
+        except Exception as exception:  # Kept too, so it is not retried
+            ttl = dns_negative_ttl
+            future.set_exception(exception)
+        else:
+            ttl = dns_ttl
+            future.set_result(address_list)
 
+        with self.lock:
+            self.entry_dict[host][1] = time.monotonic() + ttl
+            self.resolve_seconds += time.perf_counter() - span_time
 
-def get_check_link(url):  # Return uniform link so links don't get added twice
-    prefix = get_prefix(url)
-    url = get_stripped_url(url)
 
-    if prefix.startswith('http'):
-        return 'http://' + url
+class Email:
+    def __init__(self, email, log_entry=None):
+        self.email = get_stripped_email(email)
+        self.log_entry = log_entry
 
-    elif prefix.startswith('ftp'):
-        return 'ftp://' + url
+    def get_json_output(self):
+        return {'email': self.email}
 
-    return url  # Used if get_prefix() returns ''
+    def get_log_output(self):
+        return self.email
 
+    def get_print_output(self):
+        if self.log_entry is not None:
+            return self.email + ' | ' + self.log_entry
 
-def get_domain(url):  # Return domain only of passed URL
-    url = get_stripped_url(url) + '/'
+        return self.email
 
-    # Return from start of string to first '/'
-    return url[:url.find('/')]
 
+class FrontierQueue:
+    # Frontier of crawl_async(), highest depth first, so each page is
+    # expanded once, at the highest depth anything links to it with
+    # Nothing is handed out while a page two depths above it is still being
+    # crawled, as that page may yet link to it at a higher depth
+    # In polite mode items are kept by host, and get() serves the host
+    # host_scheduler can send to soonest, so a throttled host does not hold
+    # up the others
+    def __init__(self):
+        self.host_dict = {}  # Host (None if not polite) is key, heap is value
+        self.busy_dict = {}  # Depth is key, items handed out is value
+        self.put_count = 0  # Keeps items of equal priority in put order
+        self.unfinished_count = 0
+        self.change_event = asyncio.Event()
+        self.done_event = asyncio.Event()
+        self.done_event.set()
+
+    async def get(self):
+        while True:
+            min_depth = max(self.busy_dict, default=0) - 1
+            host_list = [host for host in self.host_dict
+                         if self.get_top_depth(host) >= min_depth]
+
+            if host_list:
+                break
 
-def get_ftp_parse(soup):  # Get contents of FTP soup, return all paths as list
-    lines = str(soup).splitlines()
-    paths = []
+            self.change_event.clear()
+            await self.change_event.wait()
 
-    for single_line in lines:
-        # Extract all items from line
-        # Separate by whitespace and exclude empty items i.e. ''
-        line_items = [x for x in single_line.split(' ') if x != '']
+        if host_scheduler is None:
+            item = self.pop_item(host_list[0])
+        else:
+            item = self.pop_item(host_scheduler.get_next_host(host_list))
 
-        del line_items[0:8]  # Index 8 and further are parts of the file path
+        self.busy_dict[item[1]] = self.busy_dict.get(item[1], 0) + 1
 
-        # If there are multiple line_items at this point,
-        # the path has at least one space in it and needs '%20' for each
-        paths.append('%20'.join(line_items))
+        return item
 
-    return paths
+    def get_top_depth(self, host):  # Return depth of the next item of host
+        return -self.host_dict[host][0][0]
 
+    async def join(self):
+        await self.done_event.wait()
 
-def get_merged_url(url, path):  # Merge passed domain with passed path
-    og_path = path
-    prefix = get_prefix(url)
+    def pop_item(self, host):
+        # Popped and put back last, so hosts that tie take turns
+        heap = self.host_dict.pop(host)
+        item = heapq.heappop(heap)[-1]
 
-    if url.endswith('/'):  # Trim last '/' in domain if applicable
-        url = url[:-1]
+        if heap:
+            self.host_dict[host] = heap
 
-    # If current domain is a webfile (i.e. ends with '.html')
-    #  we need to remove the file before merging the path
-    if is_web_file(url):  # Remove everything after and including new last '/'
-        url = url[:url.rindex('/')]
+        return item
 
-    while path.startswith('#/') or path.startswith('/#/'):
-        # Remove everything up to and including the first '#' from path
-        path = path[path.index('#') + 1:]
+    def push_item(self, host, priority, item):
+        heapq.heappush(self.host_dict.setdefault(host, []),
+                       (-item[1], priority, self.put_count, item))
 
-    if path.startswith('/'):
-        # i.e. /example/path should start at the raw domain
-        return prefix + get_domain(url) + path
+    def put_nowait(self, item):  # Item is a (URL, depth) pair
+        host = get_domain(item[0]) if host_scheduler is not None else None
+        self.push_item(host, get_crawl_priority(item[0]), item)
 
-    # Handle '..' backpage href shortcuts
-    while path.startswith('..'):
-        # Remove everything up to and including the first '..' from path
-        path = path[path.index('..')+3:]
+        self.put_count += 1
+        self.unfinished_count += 1
+        self.done_event.clear()
+        self.change_event.set()
 
-        try:
-            # Remove everything after new last '/',
-            # essentially going back a folder
-            url = (prefix +
-                   get_stripped_url(url)[:get_stripped_url(url).rindex('/')])
-        except Exception as exception:
-            write_log(DebugError(code_too_many_back_links,
-                                 'Too many back links',
-                                 og_path,
-                                 exception,
-                                 traceback.format_exc()))
+    def task_done(self, item):  # Item is the pair get() handed out
+        self.busy_dict[item[1]] -= 1
 
-    if url != prefix:  # If domain is more than just a prefix like http://
-        return str(prefix + get_stripped_url(url) + '/' + path)
+        if self.busy_dict[item[1]] == 0:
+            del self.busy_dict[item[1]]
 
-    # If we erased the domain above
-    # we have a '..' back link with no previous folder
-    # so we return nothing as it is worthless
-    return ''
+        self.unfinished_count -= 1
+        self.change_event.set()
 
+        if self.unfinished_count == 0:
+            self.done_event.set()
 
-def get_parsed_attribute(parent_url, tag):
-    attribute = ''
 
-    if is_html_parse(parent_url):  # Is a crawlable web file, FTP or otherwise
-        for u in qualify_attributes:
-            attribute = tag.get(u)
+class GraphWriter:
+    # Link graph of the crawl, streamed to a directory as it is crawled
+    # nodes.txt: one URL per line, node N is line N (from 0)
+    # indptr, indices: CSR arrays, links of node N are
+    # indices[indptr[N]:indptr[N + 1]]. Little-endian int64 indptr and
+    # int32 indices (int64 past 2**31 nodes), as .npy or raw .bin files
+    # Rows are spilled to a scratch file as pages come in, and put in node
+    # order on close(), so only offsets per node are kept in memory
+    def __init__(self, path, file_format):
+        os.makedirs(path, exist_ok=True)
 
-            if (attribute is not None):
-                break
-    else:  # Is FTP and not a web file
-        attribute = tag
+        self.path = path
+        self.file_format = file_format
+        self.node_dict = {}  # Checklink is key, node ID is value
+        self.node_file = open(path + 'nodes.txt', 'w')
+        self.row_file = open(path + 'rows.tmp', 'w+b')
+        self.row_start_list = array('q')  # By node ID, -1 if not crawled
+        self.row_size_list = array('q')  # By node ID
+        self.edge_count = 0
 
-    return attribute
+    def add_node(self, url):  # Return node ID of url, interned
+        canonical_url = get_canonical_url(url)
+        node = self.node_dict.get(canonical_url.check_link)
 
+        if node is None:
+            node = self.node_dict[canonical_url.check_link] = len(
+                self.node_dict)
+            self.node_file.write(canonical_url.url.replace('\n', '') + '\n')
+            self.row_start_list.append(-1)
+            self.row_size_list.append(0)
 
-def get_prefix(url):  # Return prefix only of passed URL
-    prefix = ''
+        return node
 
-    if is_qualified_email(url) or is_qualified_phone(url):
-        return prefix
+    def add_page(self, url, parsed_list):  # Add links of a crawled page
+        node = self.add_node(url)
 
-    if url in prefix_cache_dict:
-        return prefix_cache_dict[url]
+        if self.row_start_list[node] != -1:
+            return  # Its links are in already
 
-    if '//' in url and not url.startswith('//'):
-        index = url.find('//') + 2
-        prefix = url[:index]
-    else:
-        prefix = 'http://'  # Default to this prefix if none is included
-        debug_header = 'Prefix not detected'
-        debug_subheader = (
-            'The passed URL was scanned, but no prefix was detected')
-        debug_body = 'Location: get_prefix()\nResult: Returning \'http://\''
+        row = array('q', [self.add_node(parsed_url)
+                          for parsed_url in parsed_list
+                          if not is_qualified_email(parsed_url)
+                          and not is_qualified_phone(parsed_url)])
 
-        write_log(DebugInfo(url, debug_header, debug_subheader, debug_body))
+        if sys.byteorder == 'big':
+            row.byteswap()
 
-    prefix_cache_dict[url] = prefix
+        row.tofile(self.row_file)
+        self.row_start_list[node] = self.edge_count
+        self.row_size_list[node] = len(row)
+        self.edge_count += len(row)
 
-    return prefix
+    def close(self):  # Write indptr and indices in node order
+        node_count = len(self.node_dict)
+        index_code = 'q' if node_count > 2**31 - 1 else 'i'
+        indptr = array('q', [0])
 
+        for row_size in self.row_size_list:
+            indptr.append(indptr[-1] + row_size)
 
-def get_rebuilt_link(url):
-    return (get_prefix(url) + get_stripped_url(url)).replace(' ', '')
+        with open(self.get_array_path('indptr'), 'wb') as indptr_file:
+            self.write_array(indptr_file, indptr, len(indptr))
 
+        with open(self.get_array_path('indices'), 'wb') as indices_file:
+            self.write_array(indices_file, array(index_code), self.edge_count)
 
-def get_stripped_email(email):  # Return raw email
-    # i.e. 'email@example.com' instead of 'mailto:email@example.com'
-    str_to_remove = ['mailto:', ' ']
+            for row_start, row_size in zip(self.row_start_list,
+                                           self.row_size_list):
+                if row_size == 0:
+                    continue
 
-    for u in str_to_remove:
-        email = email.replace(u, '')
+                row = array('q')
+                self.row_file.seek(row_start * row.itemsize)
+                row.fromfile(self.row_file, row_size)
+                self.write_array(indices_file, array(index_code, row))
 
-    return email
+        self.node_file.close()
+        self.row_file.close()
+        os.remove(self.path + 'rows.tmp')
 
+    def get_array_path(self, name):
+        return self.path + name + '.' + self.file_format
 
-def get_stripped_phone(phone):  # Return raw phone
-    # i.e. '1234567890' instead of '(123) 456-7890' or 'tel:1234567890'
-    str_to_remove = ['tel:', '(', ')', '-', ' ']
+    def write_array(self, array_file, values, length=None):
+        # Write values little-endian, after a .npy header if length is passed
+        if length is not None and self.file_format == 'npy':
+            array_file.write(get_npy_header(
+                '<i' + str(values.itemsize), length))
 
-    for u in str_to_remove:
-        phone = phone.replace(u, '')
+        if sys.byteorder == 'big':
+            values = array(values.typecode, values)
+            values.byteswap()
 
-    return phone
+        values.tofile(array_file)
 
 
-def get_soup(url):
-    url = get_rebuilt_link(url)
-    code = None
+class HostScheduler:
+    # Token bucket per host, refilled at host_rate up to host_burst tokens
+    # A host asking for a Crawl-delay in robots.txt gets one request per delay
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.bucket_dict = {}  # Host is key, [tokens, refill time] is value
+        self.delay_dict = {}  # Host is key, Crawl-delay or None is value
+        self.robots_dict = {}  # Host is key, robots.txt fetch underway
+        self.count_dict = {}  # Host is key, [requests, first, last time]
+
+    def get_bucket(self, host):  # Return [tokens, refill time] as of now
+        now = time.monotonic()
+        bucket = self.bucket_dict.get(host)
 
-    try:  # Read and store code for parsing
-        code = request.urlopen(url, timeout=timeout).read()
-    except Exception as exception:
-        write_log(DebugError(code_unable_to_crawl,
-                             'Unable to crawl',
-                             url,
-                             exception,
-                             traceback.format_exc()
-                             ))
+        if bucket is None:
+            bucket = self.bucket_dict[host] = [self.get_burst(host), now]
 
-    if code is None:
-        code = ''
+        bucket[0] = min(self.get_burst(host),
+                        bucket[0] + (now - bucket[1]) * self.get_rate(host))
+        bucket[1] = now
 
-    return BeautifulSoup(code, features='lxml')
+        return bucket
 
+    def get_burst(self, host):
+        return 1 if self.delay_dict.get(host) else self.burst
 
-def get_stripped_url(url):  # Returns the bare URL
-    # Remove http, https, www, etc.
-    # (i.e. 'example.org' instead of 'http://www.example.org')
-    check_end_path = ''
-    str_to_remove = ['http://', 'https://', 'ftp://', 'ftps://', 'www.', ' ']
+    def get_delay(self, host):  # Return seconds until host has a token
+        return max(0, 1 - self.get_bucket(host)[0]) / self.get_rate(host)
 
-    for u in str_to_remove:
-        url = url.replace(u, '')
+    def get_next_host(self, host_iter):  # Return host with a token soonest
+        return min(host_iter, key=self.get_delay)
 
-    if url.startswith('//'):
-        url = url[+2:]
+    def get_rate(self, host):  # Return requests/sec allowed to host
+        crawl_delay = self.delay_dict.get(host)
 
-    if url.endswith('/'):
-        url = url[:-1]
+        if crawl_delay:
+            return min(self.rate, 1 / crawl_delay)
 
-    slash_index = url.rfind('/')
+        return self.rate
 
-    if (slash_index + 1 < len(url)):
-        check_end_path = url[slash_index:]
+    def get_request_rate(self, host):
+        # Return requests/sec sent to host, from its first to last request
+        count, first_time, last_time = self.count_dict[host]
 
-    if check_end_path.startswith('/#'):
-        id_index = url.rfind(check_end_path)
-        url = url[:id_index]  # If it's an ID i.e. '/#content'
+        if count < 2:
+            return 0
 
-    return url
+        return round((count - 1) / max(last_time - first_time, 1e-6), 2)
 
+    def get_reserved_delay(self, host):
+        # Take a token from host and return seconds until it is due
+        bucket = self.get_bucket(host)
+        bucket[0] -= 1
+        delay = max(0, -bucket[0]) / self.get_rate(host)
 
-def get_tag_list(url, soup):  # Return a list of links
-    tag_list = []
+        count = self.count_dict.setdefault(host, [0, None, None])
+        count[0] += 1
+        count[1] = count[1] or bucket[1] + delay
+        count[2] = bucket[1] + delay
 
-    if is_html_parse(url):
-        # If it is not an FTP URL,
-        # or it is but it's a webpage (i.e. .html file),
-        # bs can parse for the tags
-        tag_list = soup.findAll(qualify_tags)
-    else:
-        # If it is an FTP URL, and not a webpage (i.e. not a .html file),
-        # return resulting list of tags from get_ftp_parse()
-        tag_list = get_ftp_parse(soup)
+        return delay
 
-    if len(tag_list) == 0:
-        debug_header = 'No tags detected'
-        debug_subheader = 'The URL was parsed, but no tags were detected'
-        debug_body = 'SOURCE:\n\n' + str(soup)
+    def has_robots(self, host):
+        return host in self.delay_dict
 
-        write_log(DebugInfo(url, debug_header, debug_subheader, debug_body))
+    def set_backoff(self, host, seconds):  # Send nothing to host for seconds
+        bucket = self.get_bucket(host)
+        bucket[0] = min(bucket[0], 0) - seconds * self.get_rate(host)
 
-    return tag_list
+    def set_crawl_delay(self, host, crawl_delay):
+        self.delay_dict[host] = crawl_delay
+        self.robots_dict.pop(host, None)
 
 
-def has_prefix(url):
-    return '://' in url or url.startswith('//')
+class HTTPCache(SQLiteStore):
+    # Validators and parsed links of pages from earlier jobs, by checklink
+    # A page the server reports unchanged (304) is neither read nor parsed
+    def __init__(self, path):
+        super().__init__(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS page '
+            '(check_link TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+            'size INTEGER, content_hash BLOB, parsed_list TEXT)')
+        self.connection.commit()
 
+        self.hit_count = 0
+        self.miss_count = 0
+        self.saved_bytes = 0
 
-def is_beta_url(url, depth):
-    # URLs that are both on the og domain,
-    # as well as at the second-highest depth or higher
-    # (beginning of the rabbit holes basically)
-    return total_depth <= (depth + 1)
+    def add(self, check_link, url_class, response):
+        # Keep the page if the server sent a validator for it
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
 
+        if response.status != 200 or (etag is None and last_modified is None):
+            return
 
-def is_ftp(url):
-    if url.startswith('ftp://') or url.startswith('ftps://'):
-        return True
+        self.connection.execute(
+            'INSERT OR REPLACE INTO page VALUES (?, ?, ?, ?, ?, ?)',
+            (check_link, etag, last_modified, url_class.size,
+             url_class.content_hash, json.dumps(url_class.parsed_list)))
+        self.checkpoint()
 
-    return False
+    def get_headers(self, check_link):  # Return conditional request headers
+        row = self.connection.execute(
+            'SELECT etag, last_modified FROM page WHERE check_link = ?',
+            (check_link,)).fetchone()
+        header_dict = {}
 
+        if row is not None and row[0] is not None:
+            header_dict['If-None-Match'] = row[0]
 
-def is_html_parse(url):
-    # Not FTP, or is FTP with webfile (.html, etc.)
-    if not is_ftp(url):
-        return True
+        if row is not None and row[1] is not None:
+            header_dict['If-Modified-Since'] = row[1]
 
-    return is_web_file(url)
+        return header_dict
 
+    def set_not_modified(self, check_link, url_class, response):
+        # Fill url_class from the cache and return True on a 304
+        row = None
 
-def is_qualified_crawl_url(url):
-    # Return boolean on whether the passed URL is crawlable or not
-    # (i.e. not a mailto: or .mp3 file)
-    check_url = get_stripped_url(url)
+        if response.status == 304:
+            row = self.connection.execute(
+                'SELECT size, content_hash, parsed_list FROM page '
+                'WHERE check_link = ?', (check_link,)).fetchone()
 
-    if check_url.endswith('..'):  # Back links
-        return False
+        if row is None:
+            self.miss_count += 1
 
-    for u in disqualify_endings:
-        if check_url.endswith(get_stripped_url(u)):
             return False
 
-    for u in disqualify_beginnings:
-        if url.startswith(get_stripped_url(u)):
-            return False
+        url_class.status = response.status
+        url_class.size, url_class.content_hash = row[0], row[1]
+        url_class.parsed_list = tuple(json.loads(row[2]))
 
-    if url.endswith('/'):  # Remove trailing /
-        url = url[:-1]
+        self.hit_count += 1
+        self.saved_bytes += row[0]
 
-    check_url = check_url.replace(og_url, '')
-    check_url = check_url.replace(get_domain(url), '')
-    check_url = check_url.replace('/.', '')
+        return True
 
-    if '.' in check_url:
-        # After removing the domain, prefix, and any '/.'
-        # (i.e. unix hidden folders/files),
-        # if there's a '.' left check like a file extension
-        return is_web_file(url)
 
-    return True
+class LinkParser(HTMLParser):
+    # html.parser backend, collects (tag, attribute) pairs while it is fed
+    def __init__(self):
+        super().__init__()
+        self.pair_list = []
 
+    def handle_starttag(self, tag, attrs):
+        if tag in qualify_tags:
+            self.pair_list.append((tag, get_qualified_attribute(attrs)))
 
-def is_qualified_email(url):
-    # Return boolean on whether the passed item is a valid email or not
-    if url.startswith('mailto:') and url != 'mailto:':
-        return True
 
-    return False
+class LinkTarget:
+    # lxml backend, parser target that sees start tags but builds no tree
+    def __init__(self):
+        self.pair_list = []
 
+    def close(self):
+        return self.pair_list
 
-def is_qualified_phone(url):
-    # Return boolean on whether the passed item is a valid phone number or not
-    if url.startswith('tel:') and url != 'tel:':
-        return True
+    def start(self, tag, attrib):
+        if tag in qualify_tags:
+            self.pair_list.append(
+                (tag, get_qualified_attribute(attrib.items())))
 
-    return False
 
+class LogWriter:
+    # Writes log files on a background thread. Entries are handed over
+    # batch_size at a time, or by the thread itself once it has waited
+    # log_flush_interval seconds for one, and at most queue_size entries
+    # wait on the thread before write() blocks
+    # Only the crawl thread calls write(); the batch is taken under lock
+    def __init__(self, queue_size, batch_size):
+        self.batch_size = batch_size
+        self.batch = []  # Entries not handed over yet
+        self.exception = None  # First write that failed, raised on close()
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(max(queue_size // batch_size, 1))
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
 
-def is_web_file(url):
-    # Return: URL ends with one of the extensions in qualify_endings
-    if url.endswith('/'):
-        url = url[:-1]  # Remove last '/' if applicable
+    def close(self):  # Write everything, then stop the thread
+        self.put_batch()
+        self.queue.put(None)
+        self.thread.join()
 
-    for ending in qualify_endings:
-        if url.endswith(ending):
-            return True
+        if self.exception is not None:
+            raise self.exception
 
-    return False
+    def join(self):  # Wait until everything so far is written
+        self.put_batch()
+        self.queue.join()
 
+    def put_batch(self):  # Hand batch over, so queued in the order written
+        with self.lock:
+            if self.batch:
+                self.queue.put(self.batch)
 
-def write_log(entry):
-    if type(entry) is DebugError or type(entry) is DebugInfo:
-        if print_level > 1:
-            print(entry.get_print_output())
+            self.batch = []
 
-        debug_log.write(entry.get_log_output())
-    elif type(entry) is URL:
-        is_qualified_log = False
-        is_qualified_print = False
+    def put_waiting_batch(self):  # Hand over batch left waiting, by thread
+        # Lock is only tried, as the crawl thread may hold it on a full queue
+        if not self.lock.acquire(blocking=False):
+            return
+
+        try:
+            if self.batch and self.queue.empty():
+                self.queue.put_nowait(self.batch)
+                self.batch = []
+        finally:
+            self.lock.release()
+
+    def run(self):
+        while True:
+            try:
+                batch = self.queue.get(timeout=max(log_flush_interval, 0.01))
+            except queue.Empty:
+                self.put_waiting_batch()
+
+                continue
+
+            if batch is None:
+                return
+
+            text_dict = {}  # Log file is key, texts in order are value
+
+            for log_file, text in batch:
+                text_dict.setdefault(log_file, []).append(text)
+
+            try:
+                for log_file, text_list in text_dict.items():
+                    log_file.write(''.join(text_list))
+
+                    if self.queue.empty():  # Caught up, show it on disk
+                        log_file.flush()
+            except Exception as exception:
+                self.exception = self.exception or exception
+
+            self.queue.task_done()
+
+    def write(self, log_file, text):
+        with self.lock:
+            self.batch.append((log_file, text))
+            is_full = len(self.batch) >= self.batch_size
+
+        if is_full:
+            self.put_batch()
+
+
+class Metrics:
+    # Stage timings and page sizes as histograms, exported with the job
+    # counters every metrics_interval seconds from a background thread
+    # Written to path as a Prometheus text file, or shown as a status line
+    # on stderr if path is None
+    # Spans are added from the crawl and fetch threads, so under lock
+    def __init__(self, path):
+        self.path = path
+        self.histogram_dict = {}  # Name is key, [counts, sum, count] value
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def add_span(self, stage, start_time):  # Time stage from start_time
+        self.add_value(('stage', stage), time.perf_counter() - start_time)
+
+    def add_value(self, key, value):  # Key is (histogram, label) pair
+        bucket_list = metrics_bucket_dict[key[0]]
+
+        with self.lock:
+            histogram = self.histogram_dict.get(key)
+
+            if histogram is None:
+                histogram = [[0] * (len(bucket_list) + 1), 0, 0]
+                self.histogram_dict[key] = histogram
+
+            histogram[0][bisect.bisect_left(bucket_list, value)] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def close(self):  # Stop the thread, then export a last time
+        self.stop_event.set()
+        self.thread.join()
+        self.write()
+
+        if self.path is None:  # End the status line
+            sys.stderr.write('\n')
+
+    def get_percentile(self, key, percent):
+        # Return upper bound of the bucket holding percent of key's values
+        counts, _, count = self.histogram_dict[key]
+        bucket_list = metrics_bucket_dict[key[0]]
+        total = 0
+
+        for i, bucket_count in enumerate(counts):
+            total += bucket_count
+
+            if total >= count * percent / 100:
+                return bucket_list[i] if i < len(bucket_list) else math.inf
+
+        return math.inf
+
+    def get_prometheus_output(self):  # Return everything in text format
+        label = 'job_id="' + job_id + '"'
+        output = ''
+
+        for name, value, text in [
+                ('pages_total', page_count, 'Pages fetched'),
+                ('errors_total', error_count, 'Errors logged'),
+                ('debug_entries_total', debug_count, 'Debug entries logged'),
+                ('wire_bytes_total', wire_bytes, 'Body bytes received'),
+                ('decoded_bytes_total', decoded_bytes,
+                 'Body bytes after decoding'),
+                ('skipped_bodies_total', skipped_count,
+                 'Bodies not read, as they are not HTML'),
+                ('truncated_bodies_total', truncated_count,
+                 'Bodies cut off at max_body_size')]:
+            output += ('# HELP creeper_' + name + ' ' + text + '\n' +
+                       '# TYPE creeper_' + name + ' counter\n' +
+                       'creeper_' + name + '{' + label + '} ' +
+                       str(value) + '\n')
+
+        with self.lock:
+            histogram_list = sorted(
+                (key, [list(histogram[0])] + histogram[1:])
+                for key, histogram in self.histogram_dict.items())
+
+        for name, text in [('stage', 'Seconds spent in each stage'),
+                           ('page', 'Decoded bytes of each page')]:
+            metric = 'creeper_' + metrics_name_dict[name]
+            output += ('# HELP ' + metric + ' ' + text + '\n' +
+                       '# TYPE ' + metric + ' histogram\n')
+
+            for key, (counts, total, count) in histogram_list:
+                if key[0] != name:
+                    continue
+
+                key_label = label + ',' + name + '="' + key[1] + '"'
+                bucket_total = 0
+
+                for bucket, bucket_count in zip(
+                        metrics_bucket_dict[name] + ['+Inf'], counts):
+                    bucket_total += bucket_count
+                    output += (metric + '_bucket{' + key_label +
+                               ',le="' + str(bucket) + '"} ' +
+                               str(bucket_total) + '\n')
+
+                output += (metric + '_sum{' + key_label + '} ' +
+                           str(total) + '\n' +
+                           metric + '_count{' + key_label + '} ' +
+                           str(count) + '\n')
+
+        return output
+
+    def get_stats_output(self):  # Return a job stats line for each stage
+        output = ''
+
+        with self.lock:
+            key_list = sorted(key for key in self.histogram_dict
+                              if key[0] == 'stage')
+
+            for key in key_list:
+                _, total, count = self.histogram_dict[key]
+                output += ('Stage ' + key[1] + ': ' +
+                           str(round(total, 3)) + ' seconds, ' +
+                           str(count) + ' spans, p99 <= ' +
+                           str(self.get_percentile(key, 99)) + ' seconds\n')
+
+        return output
+
+    def get_status_output(self):  # Return a one line summary of the job
+        seconds = (datetime.now() - start_time).total_seconds()
+        output = ('Pages: ' + str(page_count) +
+                  ' | Pages/sec: ' +
+                  str(round(page_count / max(seconds, 1e-6), 1)) +
+                  ' | Errors: ' + str(error_count) +
+                  ' | MB: ' + str(round(wire_bytes / 1024**2, 1)))
+
+        with self.lock:
+            for stage in ['download', 'parse']:
+                if ('stage', stage) in self.histogram_dict:
+                    output += (' | ' + stage + ' p99 <= ' +
+                               str(self.get_percentile(
+                                   ('stage', stage), 99)) + 's')
+
+        return output
+
+    def run(self):
+        while not self.stop_event.wait(metrics_interval):
+            self.write()
+
+    def write(self):
+        if self.path is None:
+            sys.stderr.write('\r' + self.get_status_output())
+            sys.stderr.flush()
+            return
+
+        # Written aside, then moved over, so a scrape never sees half a file
+        with open(self.path + '.tmp', 'w') as metrics_file:
+            metrics_file.write(self.get_prometheus_output())
+
+        os.replace(self.path + '.tmp', self.path)
+
+
+class Phone:
+    def __init__(self, phone, log_entry=None):
+        self.phone = get_stripped_phone(phone)
+        self.log_entry = log_entry
+
+    def get_json_output(self):
+        return {'phone': self.phone}
+
+    def get_log_output(self):
+        return self.phone
+
+    def get_print_output(self):
+        if self.log_entry is not None:
+            return self.phone + ' | ' + self.log_entry
+
+        return self.phone
+
+
+class SeedQueue(FrontierQueue):
+    # FrontierQueue of one seed of a bulk crawl, its items carry the seed
+    # like those of WorkerQueue, so crawl_page() scopes links to it
+    def __init__(self, seed_url):
+        super().__init__()
+        self.seed_url = seed_url
+
+    def put_nowait(self, item):  # Item is a (URL, depth) pair
+        super().put_nowait(item + (self.seed_url,))
+
+
+class StoreDict:
+    # Dict kept in a CrawlStore table, only store_cache_size most recently
+    # used values stay in memory. Values are written through on assignment,
+    # so reassign a value after changing it
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.cache_dict = OrderedDict()
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+
+        if value is None:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key, value):
+        self.set_cached(key, value)
+        self.store.connection.execute(
+            'INSERT OR REPLACE INTO item VALUES (?, ?, ?)',
+            (self.name, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        self.store.checkpoint()
+
+    def clear(self):
+        self.cache_dict.clear()
+        self.store.connection.execute(
+            'DELETE FROM item WHERE name = ?', (self.name,))
+
+    def get(self, key, default=None):
+        if key in self.cache_dict:
+            self.cache_dict.move_to_end(key)
+
+            return self.cache_dict[key]
+
+        row = self.store.connection.execute(
+            'SELECT value FROM item WHERE name = ? AND key = ?',
+            (self.name, key)).fetchone()
+
+        if row is None:
+            return default
+
+        value = pickle.loads(row[0])
+        self.set_cached(key, value)
+
+        return value
+
+    def pop(self, key):
+        value = self[key]
+        self.cache_dict.pop(key)
+        self.store.connection.execute(
+            'DELETE FROM item WHERE name = ? AND key = ?', (self.name, key))
+        self.store.checkpoint()
+
+        return value
+
+    def set_cached(self, key, value):
+        self.cache_dict[key] = value
+        self.cache_dict.move_to_end(key)
+
+        if len(self.cache_dict) > store_cache_size:
+            self.cache_dict.popitem(last=False)
+
+
+class StoreQueue(FrontierQueue):
+    # FrontierQueue kept in a CrawlStore table instead of memory
+    def __init__(self, store):
+        super().__init__()
+        self.store = store  # host_dict values are {depth: count} here
+
+        store.clear_frontier()
+
+    def get_top_depth(self, host):
+        return max(self.host_dict[host])
+
+    def pop_item(self, host):
+        row = self.store.connection.execute(
+            'SELECT id, value FROM frontier WHERE host IS ? '
+            'ORDER BY depth DESC, priority, id LIMIT 1', (host,)).fetchone()
+        self.store.connection.execute(
+            'DELETE FROM frontier WHERE id = ?', (row[0],))
+
+        item = pickle.loads(row[1])
+        depth_count_dict = self.host_dict.pop(host)
+        depth_count_dict[item[1]] -= 1
+
+        if depth_count_dict[item[1]] == 0:
+            del depth_count_dict[item[1]]
+
+        if depth_count_dict:  # Put back last, so hosts that tie take turns
+            self.host_dict[host] = depth_count_dict
+
+        return item
+
+    def push_item(self, host, priority, item):
+        self.store.connection.execute(
+            'INSERT INTO frontier (host, depth, priority, value) '
+            'VALUES (?, ?, ?, ?)',
+            (host, item[1], priority,
+             pickle.dumps(item, pickle.HIGHEST_PROTOCOL)))
+        self.store.checkpoint()
+
+        depth_count_dict = self.host_dict.setdefault(host, {})
+        depth_count_dict[item[1]] = depth_count_dict.get(item[1], 0) + 1
+
+
+class URL:
+    # Lives in url_dict for the whole job, so keep it small
+    __slots__ = ('url', 'depth', 'log_entry', 'log_url', 'parsed_list',
+                 'status', 'size', 'content_hash', 'duplicate_of')
+
+    def __init__(self, url, depth, log_entry=None):
+        self.url = url
+        self.depth = depth  # Current, not total, depth level
+        self.log_entry = log_entry
+        self.log_url = get_rebuilt_link(url)
+
+        # Blank squad
+        self.parsed_list = ()  # Tuple, shared with every URLView of this
+        self.status = None
+        self.size = 0
+        self.content_hash = None
+        self.duplicate_of = None  # Log URL of the page this copies, if any
+
+    def get_json_output(self):
+        return {'url': self.log_url,
+                'depth': self.depth,
+                'status': self.status,
+                'size': self.size,
+                'log_entry': self.log_entry}
+
+    def get_log_output(self):
+        if redundancy_level != 0:
+            indent = tab * (total_depth - self.depth)
+        else:
+            indent = ''
+
+        return indent + self.log_url
+
+    def get_print_output(self):
+        if redundancy_level != 0:
+            indent = tab * (total_depth - self.depth)
+        else:
+            indent = ''
+
+        if self.log_entry is not None:
+            return indent + self.log_url + ' | ' + self.log_entry
+
+        return indent + self.log_url
+
+    def set_code(self, code, status):  # Keep stats of code, not code itself
+        self.status = status
+        self.size = len(code)
+        self.content_hash = hashlib.sha1(code).digest()
+
+        if is_keep_source:  # Indexed, as nothing else maps it to URLs
+            source_index_log.write(str(source_log.tell()) + '\t' +
+                                   str(self.size) + '\t' +
+                                   self.log_url + '\n')
+            source_log.write(code)
+
+
+class URLView:
+    # A crawled URL relogged at another depth, shares all data with record
+    __slots__ = ('record', 'depth', 'log_entry')
+
+    def __init__(self, record, depth, log_entry=None):
+        self.record = record
+        self.depth = depth
+        self.log_entry = log_entry
+
+    @property
+    def log_url(self):
+        return self.record.log_url
+
+    @property
+    def parsed_list(self):
+        return self.record.parsed_list
+
+    @property
+    def url(self):
+        return self.record.url
+
+    get_log_output = URL.get_log_output
+    get_print_output = URL.get_print_output
+
+    def get_json_output(self):
+        return dict(self.record.get_json_output(),
+                    depth=self.depth, log_entry=self.log_entry)
+
+
+class WorkerQueue:
+    # Frontier of crawl_frontier() in a worker process, kept as the targets
+    # of the WorkerStore every worker shares
+    # put_nowait() queues links of any host, get() only hands out those of
+    # the hosts of worker index. Items carry the seed they are scoped to
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+        self.claim_lock = None  # One task polls the store at once
+        self.target_dict = {}  # Item handed out is key, target ID is value
+
+    async def get(self):
+        if self.claim_lock is None:  # Made in the loop, before 3.10 it binds
+            self.claim_lock = asyncio.Lock()
+
+        async with self.claim_lock:
+            while True:
+                row = self.store.claim_target(self.index)
+
+                if row is not None:
+                    self.target_dict[row[1:]] = row[0]
+
+                    return row[1:]
+
+                await asyncio.sleep(worker_poll_interval)
+
+    async def join(self):  # Wait until every worker is out of targets
+        while self.store.get_open_count() > 0:
+            await asyncio.sleep(worker_poll_interval)
+
+    def put_nowait(self, item):  # Item is a (URL, depth) pair of og_url
+        self.store.put_target(get_check_link(item[0]),
+                              item[0],
+                              item[1],
+                              og_url,
+                              get_worker_index(item[0]),
+                              get_crawl_priority(item[0]))
+
+    def task_done(self, item):  # Item is the (URL, depth, seed) get() gave
+        self.store.set_done(self.target_dict.pop(item))
+
+
+class WorkerStore(CrawlStore):
+    # CrawlStore shared by the processes of a distributed crawl, every
+    # statement is committed as it runs so the other processes see it
+    # The frontier is a target table, kept once crawled, so a link two
+    # workers queue at the same depth is only queued once
+    def __init__(self, path):
+        super().__init__(path)
+        self.connection.isolation_level = None
+        self.connection.execute('PRAGMA busy_timeout = 60000')
+
+    def claim_target(self, index):
+        # Return (target ID, URL, depth, seed) for worker index, or None
+        # Held back while a target two depths above it is being crawled,
+        # the same as in FrontierQueue.get()
+        self.connection.execute('BEGIN IMMEDIATE')
+        row = self.connection.execute(
+            'SELECT id, url, depth, seed FROM target '
+            'WHERE worker = ? AND state = 0 AND depth >= '
+            '(SELECT IFNULL(MAX(depth), 0) - 1 FROM target WHERE state = 1) '
+            'ORDER BY depth DESC, priority, id LIMIT 1', (index,)).fetchone()
+
+        if row is not None:
+            self.connection.execute(
+                'UPDATE target SET state = 1 WHERE id = ?', (row[0],))
+
+        self.connection.execute('COMMIT')
+
+        return row
+
+    def clear_frontier(self):
+        self.connection.execute('DELETE FROM target')
+
+    def get_open_count(self):  # Return targets queued or being crawled
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM target WHERE state < 2').fetchone()[0]
+
+    def pop_stats(self):  # Return stats the workers left, then drop them
+        stat_list = [json.loads(row[0]) for row in self.connection.execute(
+            'SELECT value FROM stat ORDER BY worker')]
+        self.connection.execute('DELETE FROM stat')
+
+        return stat_list
+
+    def put_target(self, check_link, url, depth, seed, index, priority):
+        self.connection.execute(
+            'INSERT OR IGNORE INTO target '
+            '(check_link, url, depth, seed, worker, priority, state) '
+            'VALUES (?, ?, ?, ?, ?, ?, 0)',
+            (check_link, url, depth, seed, index, priority))
+
+    def set_done(self, target_id):
+        self.connection.execute(
+            'UPDATE target SET state = 2 WHERE id = ?', (target_id,))
+
+    def set_frontier(self):  # Opened by every process, so never rebuilt
+        # State is 0 while queued, 1 while crawled, and 2 once crawled
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS target '
+            '(id INTEGER PRIMARY KEY AUTOINCREMENT, check_link TEXT, '
+            'url TEXT, depth INTEGER, seed TEXT, worker INTEGER, '
+            'priority REAL, state INTEGER, UNIQUE (check_link, depth))')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS target_order ON target '
+            '(worker, state, depth DESC, priority, id)')
+        self.connection.execute(
+            'CREATE INDEX IF NOT EXISTS target_state ON target '
+            '(state, depth)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS stat '
+            '(worker INTEGER PRIMARY KEY, value TEXT)')
+
+    def set_stats(self, index, stat_dict):
+        self.connection.execute('INSERT OR REPLACE INTO stat VALUES (?, ?)',
+                                (index, json.dumps(stat_dict)))
+
+
+def add_cached_page(check_link, url_class, response):
+    if http_cache is not None:
+        http_cache.add(check_link, url_class, response)
+
+
+def add_duplicate_links(url_class, depth):
+    # Count the links a copy at depth would have been expanded to
+    for parsed_url in url_class.parsed_list:
+        if is_crawl_target(parsed_url, depth):
+            duplicate_link_set.add(get_canonical_url(parsed_url).check_link)
+
+
+def add_dns_prefetch(url):  # Resolve the host of url while url is queued
+    # Workers fetch only their own hosts, so they resolve as they go
+    if dns_cache is None or worker_count > 0:
+        return
+
+    try:
+        host = parse.urlsplit(url).hostname
+    except ValueError:  # Malformed, its fetch logs why
+        return
+
+    if host is not None:
+        dns_cache.prefetch(host)
+
+
+def add_response_count(url, response):  # Count bytes, and bodies cut short
+    global decoded_bytes, skipped_count, truncated_count, wire_bytes
+
+    decoded_bytes += len(response.code)
+    wire_bytes += response.wire_size
+
+    if metrics is not None and not response.is_skipped:
+        metrics.add_value(('page', 'decoded'), len(response.code))
+
+    if response.is_skipped and not is_html_parse(url):
+        skipped_count += 1
+        debug_header = 'Body skipped: FTP file'
+        debug_subheader = 'The path is a file, not a folder, it was not read'
+    elif response.is_skipped:
+        skipped_count += 1
+        debug_header = 'Body skipped: not HTML'
+        debug_subheader = 'The content type is not HTML, the body was not read'
+    elif response.is_truncated:
+        truncated_count += 1
+        debug_header = 'Body truncated'
+        debug_subheader = ('The body was cut off at ' + str(max_body_size) +
+                           ' bytes, only that much was parsed')
+    else:
+        return
+
+    debug_body = 'Content-Type: ' + str(response.headers.get('Content-Type'))
+
+    write_log(DebugInfo(url, debug_header, debug_subheader, debug_body))
+
+
+def close_shared(key_list=None):
+    # Stop what run_job() keeps up between jobs, or only those in key_list
+    global connection_pool, dns_cache, fetch_executor, http_cache
+    global parse_executor
+
+    if key_list is None:
+        key_list = ['connection_pool', 'dns_cache', 'fetch_executor',
+                    'http_cache', 'parse_executor']
+
+    if connection_pool is not None and 'connection_pool' in key_list:
+        connection_pool.close()
+        connection_pool = None
+
+    if dns_cache is not None and 'dns_cache' in key_list:
+        dns_cache.close()
+        dns_cache = None
+
+    if http_cache is not None and 'http_cache' in key_list:
+        http_cache.close()
+        http_cache = None
+
+    if fetch_executor is not None and 'fetch_executor' in key_list:
+        fetch_executor.shutdown()
+        fetch_executor = None
+
+    if parse_executor is not None and 'parse_executor' in key_list:
+        parse_executor.shutdown()
+        parse_executor = None
+
+
+def crawl(url, depth):
+    # Log the tree under url, depth first, from pages crawl_async() fetched
+    # Walked with a stack of link iterators, so deep sites don't recurse
+    frame = get_crawl_frame(url, depth)
+    frame_list = [] if frame is None else [frame]
+
+    while frame_list:
+        link_iter, current_depth = frame_list[-1]
+
+        for parsed_url in link_iter:
+            if not is_crawl_target(parsed_url, current_depth):
+                write_link_log(parsed_url, current_depth - 1)
+                continue
+
+            frame = get_crawl_frame(parsed_url, current_depth - 1)
+
+            if frame is not None:  # Finish its tree before the next link
+                frame_list.append(frame)
+                break
+        else:
+            frame_list.pop()
+
+
+async def crawl_async(url, depth):
+    # Fetch every page crawl() would visit, breadth first, expanding each
+    # once at the highest depth it is linked with
+    # Results are kept in prefetch_dict, so crawl() can log the same
+    # tree afterwards without waiting on the network
+    frontier = FrontierQueue()
+    depth_dict = {}  # Checklink is key, highest depth queued is value
+
+    if page_store is not None:  # Keep both out of memory
+        frontier = StoreQueue(page_store)
+        depth_dict = StoreDict(page_store, 'depth')
+        depth_dict.clear()
+
+    put_crawl_target(frontier, depth_dict, url, depth)
+
+    await crawl_frontier(frontier, depth_dict)
+
+
+async def crawl_frontier(frontier, depth_dict):
+    # Crawl what is queued in frontier, and what that links to, until empty
+    # A worker only ends by raising, which is raised here once all stop
+    workers = [asyncio.create_task(crawl_worker(frontier, depth_dict))
+               for _ in range(max_concurrency if is_concurrent_mode else 1)]
+    join_task = asyncio.create_task(frontier.join())
+
+    await asyncio.wait(workers + [join_task],
+                       return_when=asyncio.FIRST_COMPLETED)
+
+    for task in workers + [join_task]:
+        task.cancel()
+
+    for result in await asyncio.gather(*workers, join_task,
+                                       return_exceptions=True):
+        if isinstance(result, Exception):
+            raise result
+
+
+async def crawl_page(
+        frontier, depth_dict, current_url, current_depth, seed_url=None):
+    global page_count
+
+    canonical_url = get_canonical_url(current_url)
+    current_url = canonical_url.url
+    current_check_link = canonical_url.check_link
+
+    if current_depth < depth_dict[current_check_link]:
+        return  # Queued again at a higher depth, expanded from there
+
+    url_class = prefetch_dict.get(current_check_link)
+
+    if url_class is None:  # Crawled for a previous seed
+        url_class = url_dict.get(current_check_link)
+
+    if url_class is None and seed_budget_dict.get(seed_url) == 0:
+        # Logged by crawl() like any page, but neither fetched nor expanded
+        prefetch_dict[current_check_link] = URL(
+            current_url, current_depth, 'Over page budget')
+        return
+
+    if url_class is None:
+        url_class = URL(current_url, current_depth)
+        loop = asyncio.get_running_loop()
+
+        if seed_url in seed_budget_dict:
+            seed_budget_dict[seed_url] -= 1
+
+        if host_scheduler is not None:
+            await wait_for_host(current_url)
+
+        try:  # Only the download runs on the fetch executor
+            response = await loop.run_in_executor(
+                fetch_executor, get_code, current_url,
+                get_cache_headers(current_check_link))
+        except Exception as exception:
+            response = Response(b'', getattr(exception, 'code', 0),
+                                getattr(exception, 'headers', None))
+            write_log(DebugError(code_unable_to_crawl,
+                                 'Unable to crawl',
+                                 current_url,
+                                 exception,
+                                 traceback.format_exc()
+                                 ))
+
+        page_count += 1
+        add_response_count(current_url, response)
+        set_host_backoff(current_url, response)
+
+        if not is_not_modified(current_check_link, url_class, response):
+            code = response.code
+            span_time = (time.perf_counter() if metrics is not None
+                         else None)
+
+            if response.is_skipped:  # Nothing was read, so nothing to parse
+                attribute_list = []
+            elif parse_executor is None:
+                attribute_list = get_attribute_list(current_url, code)
+            else:  # Only the raw code and the attributes cross processes
+                attribute_list = await loop.run_in_executor(
+                    parse_executor, get_attribute_list, current_url, code)
+
+            if metrics is not None:
+                metrics.add_span('parse', span_time)
+                span_time = time.perf_counter()
+
+            url_class.set_code(code, response.status)
+            url_class.parsed_list = get_parsed_list(
+                current_url, attribute_list, code, response)
+
+            if metrics is not None:
+                metrics.add_span('links', span_time)
+            set_duplicate(current_url, url_class, code)
+            add_cached_page(current_check_link, url_class, response)
+
+        prefetch_dict[current_check_link] = url_class
+
+    if seed_url is not None:  # From WorkerQueue or SeedQueue, set just before
+        set_og_url(seed_url)  # expanding, as other seeds crawl in between
+
+    if url_class.duplicate_of is not None:  # Expanded from the original
+        add_duplicate_links(url_class, current_depth)
+        return
+
+    for parsed_url in url_class.parsed_list:
+        if is_crawl_target(parsed_url, current_depth):
+            put_crawl_target(
+                frontier, depth_dict, parsed_url, current_depth - 1)
+
+
+async def crawl_seed(url, depth):
+    # Fetch the tree of seed url like crawl_async(), then log it with crawl()
+    # Runs alongside the other seeds of crawl_seed_file(), each with its own
+    # frontier and depth, so one seed never holds up another
+    global seed_count, total_depth
+
+    frontier = SeedQueue(url)
+    depth_dict = {}
+
+    if seed_page_budget is not None:
+        seed_budget_dict[url] = seed_page_budget
+
+    set_og_url(url)
+    put_crawl_target(frontier, depth_dict, url, depth)
+
+    try:
+        await crawl_frontier(frontier, depth_dict)
+    finally:
+        seed_budget_dict.pop(url, None)
+
+    # Logged whole, with nothing else running, so its lines stay together
+    job_depth, total_depth = total_depth, depth  # Indents by seed depth
+    set_og_url(url)
+
+    try:
+        crawl(url, depth)
+    finally:
+        total_depth = job_depth
+
+    write_end_crawl(url)
+    seed_count += 1
+
+
+async def crawl_seed_file(path):
+    # Crawl the seeds of the file at path, max_active_seeds at a time
+    # Read as it goes, so a file of any size is never held in memory
+    task_set = set()
+
+    for url, depth in get_seed_pairs(path):
+        if len(task_set) >= max_active_seeds:
+            done_set, task_set = await asyncio.wait(
+                task_set, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done_set:
+                task.result()  # Raise what stopped the seed, if anything
+
+        task_set.add(asyncio.create_task(crawl_seed(url, depth)))
+
+    if task_set:
+        await asyncio.gather(*task_set)
+
+
+def crawl_workers(url_list, depth):
+    # Fetch like crawl_async(), for every seed in url_list at once, over
+    # worker_count run_worker() processes
+    # Each crawls the hosts get_worker_index() gives it, sharing frontier,
+    # dedup and pages through page_store, so crawl() logs the trees after
+    global canonical_hit_count, canonical_miss_count, debug_count
+    global decoded_bytes, duplicate_count, error_count
+    global near_duplicate_count, page_count, skipped_count, truncated_count
+    global wire_bytes
+
+    frontier = WorkerQueue(page_store, None)
+    depth_dict = StoreDict(page_store, 'depth')
+    frontier.store.clear_frontier()
+    depth_dict.clear()
+
+    for url in url_list:  # Queued with its seed, so scoped to it
+        set_og_url(url)
+        put_crawl_target(frontier, depth_dict, url, depth)
+
+    # All of the job's config, but crawl_priority, a function, is not sent
+    page_store.set_config({'worker_config': {
+        key: globals()[key] for key in config_key_list + [
+            'debug_log_path', 'job_id', 'source_index_log_path',
+            'source_log_path'] if key != 'crawl_priority'}})
+
+    # Spawned, as log_writer is a thread a fork would copy mid-write
+    context = multiprocessing.get_context('spawn')
+    process_list = [context.Process(target=run_worker,
+                                    args=(page_store.path, index))
+                    for index in range(worker_count)]
+
+    for process in process_list:
+        process.start()
+
+    try:
+        for process in process_list:
+            while process.is_alive():
+                process.join(1)
+
+                for u in process_list:  # The others would wait on it
+                    if u.exitcode not in [None, 0]:
+                        raise RuntimeError('Worker ' +
+                                           str(process_list.index(u)) +
+                                           ' exited with code ' +
+                                           str(u.exitcode))
+    finally:
+        for process in process_list:
+            if process.is_alive():
+                process.terminate()
+
+            process.join()
+
+    for stat_dict in page_store.pop_stats():
+        canonical_hit_count += stat_dict['canonical_hit_count']
+        canonical_miss_count += stat_dict['canonical_miss_count']
+        debug_count += stat_dict['debug_count']
+        decoded_bytes += stat_dict['decoded_bytes']
+        duplicate_count += stat_dict['duplicate_count']
+        error_count += stat_dict['error_count']
+        near_duplicate_count += stat_dict['near_duplicate_count']
+        page_count += stat_dict['page_count']
+        skipped_count += stat_dict['skipped_count']
+        truncated_count += stat_dict['truncated_count']
+        wire_bytes += stat_dict['wire_bytes']
+        connection_pool.hit_count += stat_dict['pool_hit_count']
+        connection_pool.miss_count += stat_dict['pool_miss_count']
+        duplicate_link_set.update(stat_dict['duplicate_links'])
+
+        if dns_cache is not None:
+            for key, value in zip(dns_stat_key_list, stat_dict['dns_stats']):
+                setattr(dns_cache, key, getattr(dns_cache, key) + value)
+
+
+async def crawl_worker(frontier, depth_dict):
+    while True:
+        item = await frontier.get()
+
+        try:
+            await crawl_page(frontier, depth_dict, *item)
+        except Exception as exception:
+            write_log(DebugError(code_unable_to_crawl,
+                                 'Unable to crawl',
+                                 item[0],
+                                 exception,
+                                 traceback.format_exc()
+                                 ))
+        finally:
+            frontier.task_done(item)
+
+
+def get_attribute_list(url, code):  # Return attributes of each tag in code
+    # Also runs in parse_executor processes, so leave job state alone
+    if not is_html_parse(url):  # FTP listing, there are no tags to parse
+        return get_ftp_parse(code)
+
+    if parse_backend == 'soup':
+        from bs4 import BeautifulSoup  # Slow to import, so only if used
+
+        # Not timed in parse_executor processes, which export no metrics
+        is_timed = metrics is not None and parse_executor is None
+        span_time = time.perf_counter() if is_timed else None
+        soup = BeautifulSoup(code, features='lxml')
+
+        if is_timed:
+            metrics.add_span('soup', span_time)
+            span_time = time.perf_counter()
+
+        tag_list = get_tag_list(url, soup)
+
+        if is_timed:
+            metrics.add_span('tags', span_time)
+            span_time = time.perf_counter()
+
+        attribute_list = [get_parsed_attribute(url, tag) for tag in tag_list]
+
+        if is_timed:
+            metrics.add_span('attributes', span_time)
+
+        if is_scrape_mode and is_text_scrape_mode:
+            attribute_list += get_text_contact_list(code)
+
+        return attribute_list
+
+    attribute_list = [attribute for tag, attribute in get_link_pairs(code)]
+
+    if is_scrape_mode and is_text_scrape_mode:
+        attribute_list += get_text_contact_list(code)
+
+    return attribute_list
+
+
+def get_body(reader):
+    # Return (body, is_truncated), read from BodyReader up to max_body_size
+    chunk_list = []
+    size = 0
+
+    while size <= max_body_size:
+        chunk = reader.read(min(parse_chunk_size, max_body_size + 1 - size))
+
+        if not chunk:
+            return b''.join(chunk_list), False
+
+        chunk_list.append(chunk)
+        size += len(chunk)
+
+    return b''.join(chunk_list)[:max_body_size], True
+
+
+def get_canonical_url(url, base_url=None):
+    # Return CanonicalURL of url, merged with base_url first if passed
+    # Kept in a canonical_cache_size LRU cache
+    global canonical_hit_count, canonical_miss_count
+
+    cache_key = (url, base_url)
+    canonical_url = canonical_cache_dict.get(cache_key)
+
+    if canonical_url is not None:
+        canonical_hit_count += 1
+        canonical_cache_dict.move_to_end(cache_key)
+
+        return canonical_url
+
+    canonical_miss_count += 1
+
+    if base_url is not None:
+        canonical_url = CanonicalURL(get_joined_url(base_url, url))
+    else:
+        canonical_url = CanonicalURL(url)
+
+    if not canonical_url.has_prefix:
+        debug_header = 'Prefix not detected'
+        debug_subheader = (
+            'The passed URL was scanned, but no prefix was detected')
+        debug_body = ('Location: get_canonical_url()\n' +
+                      'Result: Returning \'http://\'')
+
+        write_log(DebugInfo(url, debug_header, debug_subheader, debug_body))
+
+    canonical_cache_dict[cache_key] = canonical_url
+
+    if len(canonical_cache_dict) > canonical_cache_size:
+        canonical_cache_dict.popitem(last=False)
+
+    return canonical_url
+
+
+def get_cache_headers(check_link):  # Return validators to send, if cached
+    if http_cache is None:
+        return {}
+
+    return http_cache.get_headers(check_link)
+
+
+def get_check_link(url):  # Return uniform link so links don't get added twice
+    return get_canonical_url(url).check_link
+
+
+def get_cli_config(arg_list):
+    # Return (url_list, resumed JobID, config_dict) the command line sets
+    # Options not passed are left out of config_dict, as is everything
+    # when arg_list is empty and the prompts should ask instead
+    parser = argparse.ArgumentParser(
+        prog='creeper.py',
+        description='Crawl the target URL(s). Without arguments, ' +
+                    'every option is asked for in turn.')
+    parser.add_argument('url_list', nargs='*', metavar='URL',
+                        help='target URL(s)')
+    parser.add_argument('-d', '--depth', type=int, dest='total_depth',
+                        metavar='N',
+                        help='levels deep to crawl (default: ' +
+                             str(total_depth) + ')')
+    parser.add_argument('--scrape', action=argparse.BooleanOptionalAction,
+                        dest='is_scrape_mode',
+                        help='scrape for emails and phone numbers')
+    parser.add_argument('--save', action=argparse.BooleanOptionalAction,
+                        dest='is_save_mode',
+                        help='save all data to files in the logs folder')
+    parser.add_argument('-r', '--redundancy', type=int, choices=[0, 1, 2],
+                        dest='redundancy_level',
+                        help='0: unique, 1: standard, 2: redundant')
+    parser.add_argument('-c', '--concurrent',
+                        action=argparse.BooleanOptionalAction,
+                        dest='is_concurrent_mode',
+                        help='fetch up to max_concurrency pages at a time')
+    parser.add_argument('-p', '--print-level', type=int, choices=[0, 1, 2],
+                        dest='print_level',
+                        help='0: quiet, 1: standard, 2: verbose')
+    parser.add_argument('-f', '--seed-file', dest='seed_file_path',
+                        metavar='PATH',
+                        help="crawl the seeds of a file in bulk, a " +
+                             "'URL [depth]' per line")
+    parser.add_argument('--resume', metavar='JOBID',
+                        help='resume a persistent job')
+    parser.add_argument('-o', '--option', action='append', default=[],
+                        metavar='NAME=VALUE',
+                        help='set any of the Defaults in creeper.py, ' +
+                             'as a Python literal (e.g. -o timeout=5)')
+    args = parser.parse_args(arg_list)
+
+    if (arg_list and not args.url_list and args.resume is None
+            and args.seed_file_path is None):
+        parser.error('pass target URLs, --seed-file or --resume')
+
+    if args.url_list and args.resume is not None:
+        parser.error('pass target URLs or --resume, not both')
+
+    if args.resume is not None and not os.path.isfile(
+            state_log_dir + args.resume + '.sqlite'):
+        parser.error('no crawl state for JobID ' + args.resume)
+
+    if args.total_depth is not None and args.total_depth < 1:
+        parser.error('--depth must be 1 or more')
+
+    config_dict = {key: getattr(args, key) for key in [
+        'total_depth', 'is_scrape_mode', 'is_save_mode', 'redundancy_level',
+        'is_concurrent_mode', 'print_level', 'seed_file_path']
+        if getattr(args, key) is not None}
+
+    for option in args.option:
+        key, _, value = option.partition('=')
+
+        if key not in config_key_list:
+            parser.error('unknown option name: ' + key)
+
+        try:
+            config_dict[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):  # Bare word, take it as a string
+            config_dict[key] = value
+
+    if args.resume is not None:
+        config_dict['is_persistent_mode'] = True
+
+    return args.url_list, args.resume, config_dict
+
+
+def get_code(url, header_dict=None):  # Return Response, raises on failure
+    if url.startswith('http://') or url.startswith('https://'):
+        return get_http_code(url, header_dict)
+
+    return get_ftp_code(url)
+
+
+def get_crawl_delay(url):  # Return Crawl-delay of the host of url, or None
+    split_url = parse.urlsplit(url)
+
+    if split_url.scheme not in ['http', 'https']:
+        return None
+
+    robots = robotparser.RobotFileParser()
+
+    try:
+        code = get_http_code(  # text/plain, so read whatever its type
+            split_url.scheme + '://' + split_url.netloc + '/robots.txt',
+            is_html_only=False).code
+    except Exception:  # No robots.txt, nothing asked for
+        return None
+
+    robots.parse(str(code, 'utf-8', 'replace').splitlines())
+    robots.modified()  # crawl_delay() reads nothing until marked as fetched
+
+    return robots.crawl_delay(http_headers['User-Agent'])
+
+
+def get_crawl_frame(current_url, current_depth):
+    # Log current_url as crawl() reaches it, return (link iterator, depth)
+    # to walk its links with, or None if they are not walked from here
+    canonical_url = get_canonical_url(current_url)
+    current_url = canonical_url.url
+    current_check_link = canonical_url.check_link
+    has_crawled = current_check_link in url_dict
+
+    if current_depth > 0 and not has_crawled:
+        if current_check_link in prefetch_dict:  # Fetched by crawl_async()
+            url_class = prefetch_dict.pop(current_check_link)
+            url_class.depth = current_depth
+        else:
+            if host_scheduler is not None:
+                time.sleep(get_polite_delay(current_url))
+
+            response = get_page_code(
+                current_url, get_cache_headers(current_check_link))
+            url_class = URL(current_url, current_depth)
+            set_host_backoff(current_url, response)
+
+            if not is_not_modified(current_check_link, url_class, response):
+                code = response.code
+                span_time = (time.perf_counter() if metrics is not None
+                             else None)
+                attribute_list = ([] if response.is_skipped
+                                  else get_attribute_list(current_url, code))
+
+                if metrics is not None:
+                    metrics.add_span('parse', span_time)
+                    span_time = time.perf_counter()
+
+                url_class.set_code(code, response.status)
+                url_class.parsed_list = get_parsed_list(
+                    current_url, attribute_list, code, response)
+
+                if metrics is not None:
+                    metrics.add_span('links', span_time)
+                set_duplicate(current_url, url_class, code)
+                add_cached_page(current_check_link, url_class, response)
+
+        current_crawl_job, url_dict[current_check_link] = url_class, url_class
+
+        if graph_writer is not None:
+            graph_writer.add_page(current_url, url_class.parsed_list)
+
+        if (is_beta_url(current_url, current_depth)
+                and is_qualified_crawl_url(current_url)
+                and current_crawl_job.log_entry is None):
+            current_crawl_job.log_entry = 'Crawling...'
+
+        write_log(current_crawl_job)
+
+        if current_crawl_job.duplicate_of is not None:
+            add_duplicate_links(current_crawl_job, current_depth)
+            return None  # Walked from the page it copies
+
+        return iter(current_crawl_job.parsed_list), current_depth
+    elif current_depth > 0:  # URL has already been crawled, get the result
+        is_higher_depth = (
+            current_depth > url_dict[current_check_link].depth)
+
+        # If current_depth is greater than when we last crawled this URL,
+        # update the depth so we don't recrawl at anything equal to or less
+        if (is_higher_depth):
+            url_class = url_dict[current_check_link]
+            url_class.depth = current_depth
+            url_dict[current_check_link] = url_class  # Write through
+
+        if is_higher_depth or redundancy_level == 2:
+            current_relog_job = URLView(url_dict[current_check_link],
+                                        current_depth,
+                                        'Already crawled')
+
+            write_log(current_relog_job)
+
+            if current_relog_job.record.duplicate_of is None:
+                return iter(current_relog_job.parsed_list), current_depth
+
+    return None
+
+
+def get_crawl_priority(url):  # Return priority of url among its depth
+    if crawl_priority is None:
+        return 0
+
+    return crawl_priority(url)
+
+
+def get_debug_source(code):
+    # Return code for a debug entry, cut to debug_source_size with its hash
+    if debug_source_size is None or len(code) <= debug_source_size:
+        return str(code, 'utf-8', 'replace')
+
+    return (str(code[:debug_source_size], 'utf-8', 'replace') +
+            '\n\n[Cut off, ' + str(len(code)) + ' bytes, SHA-1 ' +
+            hashlib.sha1(code).hexdigest() + ']')
+
+
+def get_domain(url):  # Return domain only of passed URL
+    return get_canonical_url(url).domain
+
+
+def get_encoding(code):  # Return charset declared at the top of code
+    match = charset_pattern.search(code[:2048])
+
+    if match is not None:
+        try:
+            return codecs.lookup(match.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+
+    return 'utf-8'  # Default to this encoding if none is declared
+
+
+def get_ftp_code(url):  # Return Response of an FTP(S) URL, over the pool
+    split_url = parse.urlsplit(url)
+    host_key = (split_url.scheme, split_url.hostname, split_url.port,
+                parse.unquote(split_url.username or 'anonymous'),
+                parse.unquote(split_url.password or 'anonymous@'))
+    path = parse.unquote(split_url.path) or '/'
+
+    # Servers often allow few sessions per client, so no more are opened
+    with connection_pool.get_slot(host_key, max_ftp_sessions):
+        session, is_reused = connection_pool.get_connection(host_key)
+
+        try:
+            try:
+                response = get_ftp_response(session, url, path)
+            except (ftplib.error_temp, ftplib.error_reply, EOFError,
+                    OSError):
+                if not is_reused:
+                    raise
+
+                # The host dropped the idle session, retry on a new one
+                session.close()
+                session = connection_pool.get_new_connection(host_key)
+                response = get_ftp_response(session, url, path)
+        except ftplib.error_perm:  # i.e. 550, the session is still good
+            connection_pool.put_connection(host_key, session)
+            raise
+        except Exception:
+            session.close()
+            raise
+
+        if response.is_truncated:
+            session.close()  # Unread data left on it
+        else:
+            connection_pool.put_connection(host_key, session)
+
+    return response
+
+
+def get_ftp_data(session, command):
+    # Return (data, is_truncated) of command, read up to max_body_size
+    chunk_list = []
+    size = 0
+
+    with session.transfercmd(command) as data_socket:
+        while size <= max_body_size:
+            chunk = data_socket.recv(parse_chunk_size)
+
+            if not chunk:
+                break
+
+            chunk_list.append(chunk)
+            size += len(chunk)
+
+    if size > max_body_size:  # The server answers 426, the session goes
+        return b''.join(chunk_list)[:max_body_size], True
+
+    session.voidresp()
+
+    return b''.join(chunk_list), False
+
+
+def get_ftp_parse(code):  # Return path of each entry of an FTP listing
+    # Takes MLSD, Unix and DOS LIST listings, one line at a time, so a
+    # server that mixes them is still read. Other lines are taken as NLST
+    paths = []
+
+    for line in code.splitlines():
+        match = ftp_mlsd_pattern.fullmatch(line)
+
+        if match is not None:
+            if b'type=cdir;' in match.group(1).lower() or (
+                    b'type=pdir;' in match.group(1).lower()):
+                continue  # The listed folder and its parent
+        else:
+            match = (ftp_unix_pattern.fullmatch(line)
+                     or ftp_dos_pattern.fullmatch(line))
+
+        if match is not None:
+            name = match.group(match.lastindex)
+
+            if line.startswith(b'l'):  # Symlink, 'name -> target'
+                name = name.split(b' -> ')[0]
+        else:
+            name = line.strip()
+
+        if name and name not in [b'.', b'..']:
+            paths.append(parse.quote(str(name, 'utf-8', 'replace')))
+
+    return paths
+
+
+def get_ftp_response(session, url, path):
+    # Return Response of path, retrieved if a web file, listed if a folder
+    span_time = (time.perf_counter() if metrics is not None
+                 else None)
+
+    if is_web_file(url):
+        code, is_truncated = get_ftp_data(session, 'RETR ' + path)
+    else:
+        try:
+            session.cwd(path)
+        except ftplib.error_perm:  # A file, with nothing to parse in it
+            return Response(b'', None, is_skipped=True)
+
+        if session.has_mlsd:
+            try:  # Same for every server, unlike LIST
+                code, is_truncated = get_ftp_data(session, 'MLSD')
+            except ftplib.error_perm:  # 500 or 502, before any data
+                session.has_mlsd = False
+
+        if not session.has_mlsd:
+            code, is_truncated = get_ftp_data(session, 'LIST')
+
+    if metrics is not None:
+        metrics.add_span('download', span_time)
+
+    return Response(code, None, is_truncated=is_truncated,
+                    wire_size=len(code))
+
+
+def get_ftp_session(host_key):  # Return new session, logged in to host
+    scheme, host, port, user, password = host_key
+    session = ftplib.FTP_TLS() if scheme == 'ftps' else ftplib.FTP()
+
+    try:
+        if dns_cache is None:
+            session.connect(host, port or 21, timeout=timeout)
+        else:  # First address only, ftplib resolves nothing else itself
+            session.connect(dns_cache.get_address_list(host)[0][4][0],
+                            port or 21, timeout=timeout)
+            session.host = host  # Named to the server in TLS
+
+        session.login(user, password)
+
+        if scheme == 'ftps':
+            session.prot_p()  # Data connections encrypted too
+    except Exception:
+        session.close()
+        raise
+
+    session.has_mlsd = True  # Until the server says otherwise
+
+    return session
+
+
+def get_http_code(url, header_dict=None, is_html_only=True):
+    # Return Response over the pool, the body read only if HTML, unless
+    # is_html_only is False
+    header_dict = dict(http_headers, **(header_dict or {}))
+
+    for _ in range(max_redirects + 1):
+        split_url = parse.urlsplit(url)
+        host_key = (split_url.scheme, split_url.hostname, split_url.port)
+        path = split_url.path or '/'
+
+        if split_url.query:
+            path += '?' + split_url.query
+
+        connection, is_reused = connection_pool.get_connection(host_key)
+        request_header_dict = header_dict
+        span_time = (time.perf_counter() if metrics is not None
+                     else None)
+
+        if connection.proxy_header_dict is not None:
+            path = split_url.scheme + '://' + split_url.netloc + path
+            request_header_dict = dict(header_dict,
+                                       **connection.proxy_header_dict)
+
+        try:
+            try:
+                connection.request('GET', path, headers=request_header_dict)
+                response = connection.getresponse()
+            except (http.client.HTTPException, OSError):
+                if not is_reused:
+                    raise
+
+                # The host dropped the idle connection, retry on a new one
+                connection.close()
+                connection = connection_pool.get_new_connection(host_key)
+                connection.request('GET', path, headers=request_header_dict)
+                response = connection.getresponse()
+
+            if metrics is not None:
+                metrics.add_span('request', span_time)
+                span_time = time.perf_counter()
+
+            # Look at the headers before reading a body no one will parse
+            is_skipped = (is_html_only and response.status < 300 and
+                          not is_html_content(
+                              response.getheader('Content-Type')))
+            reader = BodyReader(
+                response, response.getheader('Content-Encoding'))
+            code, is_truncated = (
+                (b'', False) if is_skipped else get_body(reader))
+
+            if metrics is not None:
+                metrics.add_span('download', span_time)
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close or is_skipped or is_truncated:
+            connection.close()  # Unread body left on it
+        else:
+            connection_pool.put_connection(host_key, connection)
+
+        location = response.getheader('Location')
+
+        if response.status in redirect_codes and location is not None:
+            url = parse.urljoin(url, location)
+            continue
+
+        if response.status >= 400:
+            raise error.HTTPError(url, response.status, response.reason,
+                                  response.headers, None)
+
+        return Response(code, response.status, response.headers,
+                        is_skipped, is_truncated, reader.wire_size)
+
+    raise error.HTTPError(url, response.status, 'Too many redirects',
+                          response.headers, None)
+
+
+def get_joined_url(url, path):  # Resolve path against url, like a browser
+    while path.startswith('#/') or path.startswith('/#/'):
+        # Remove everything up to and including the first '#' from path
+        path = path[path.index('#') + 1:]
+
+    url = get_canonical_url(url).url
+
+    # If current URL is not a webfile (i.e. ends with '.html')
+    # it is a folder, even without the last '/'
+    if not is_web_file(url):
+        url += '/'
+
+    if parse.urlsplit(path).scheme not in join_schemes + ['']:
+        path = './' + path  # i.e. 'javascript:' is a path here, not a scheme
+
+    back_count = len(back_link_pattern.match(path).group(0)) // 3
+    folder_count = parse.urlsplit(url).path.count('/') - 1
+
+    if back_count > folder_count:
+        write_log(DebugError(code_too_many_back_links,
+                             'Too many back links',
+                             path))
+
+    return parse.urljoin(url, path)
+
+
+def get_key_hash(key):  # Return the two hashes BloomFilter positions use
+    digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    return (int.from_bytes(digest[:8], 'little'),
+            int.from_bytes(digest[8:], 'little') | 1)
+
+
+def get_link_pairs(code):
+    # Yield (tag, attribute) for each qualify_tags tag as code is parsed,
+    # one parse_chunk_size chunk at a time
+    encoding = get_encoding(code)
+
+    if parse_backend == 'html.parser':
+        parser = LinkParser()
+        code = str(code, encoding, 'replace')
+    else:
+        from lxml import etree  # Slow to import, so only if used
+
+        parser = etree.HTMLParser(target=LinkTarget(), encoding=encoding)
+
+    for i in range(0, len(code), parse_chunk_size):
+        parser.feed(code[i:i + parse_chunk_size])
+
+        if parse_backend == 'html.parser':
+            pair_list, parser.pair_list = parser.pair_list, []
+        else:
+            pair_list, parser.target.pair_list = parser.target.pair_list, []
+
+        yield from pair_list
+
+    if len(code) > 0:
+        yield from parser.close() or []
+
+
+def get_log_line(entry):  # Return what write_log() writes of entry
+    if is_ndjson_mode:
+        return json.dumps(entry.get_json_output()) + '\n'
+
+    if type(entry) is DebugError or type(entry) is DebugInfo:
+        return entry.get_log_output()  # Ends in a divider
+
+    return entry.get_log_output() + '\n'
+
+
+def get_merged_url(url, path):  # Merge passed domain with passed path
+    return get_canonical_url(path, url).url
+
+
+def get_npy_header(descr, length):  # Return .npy 1.0 header of a 1-D array
+    header = ("{'descr': '" + descr + "', 'fortran_order': False, " +
+              "'shape': (" + str(length) + ",), }")
+    header += ' ' * (-(len(header) + 11) % 64) + '\n'  # Aligned to 64
+
+    return (b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') +
+            header.encode('latin1'))
+
+
+def get_page_code(url, header_dict=None):  # Return Response, b'' on failure
+    global page_count
+
+    url = get_rebuilt_link(url)
+    response = None
+    page_count += 1
+
+    try:  # Read and store code for parsing
+        response = get_code(url, header_dict)
+    except Exception as exception:
+        # HTTP errors have a status, anything else has no response
+        response = Response(b'', getattr(exception, 'code', 0),
+                            getattr(exception, 'headers', None))
+        write_log(DebugError(code_unable_to_crawl,
+                             'Unable to crawl',
+                             url,
+                             exception,
+                             traceback.format_exc()
+                             ))
+
+    add_response_count(url, response)
+
+    return response
+
+
+def get_parsed_attribute(parent_url, tag):
+    attribute = ''
+
+    for u in qualify_attributes:
+        attribute = tag.get(u)
+
+        if (attribute is not None):
+            break
+
+    return attribute
+
+
+def get_parsed_list(url, attribute_list, code, response):
+    # Return tuple of unique links from the get_attribute_list() attributes
+    # A body skipped or cut short has its one entry from add_response_count()
+    parsed_list = []
+    parsed_set = set()  # Same links, for lookups
+    has_qualified_attributes = False
+
+    if response.is_skipped:
+        return ()
+
+    if len(attribute_list) == 0 and not response.is_truncated:
+        debug_header = 'No tags detected'
+        debug_subheader = 'The URL was parsed, but no tags were detected'
+        debug_body = 'SOURCE:\n\n' + get_debug_source(code)
+
+        write_log(DebugInfo(url, debug_header, debug_subheader, debug_body))
+
+    for parsed_url in attribute_list:
+        if parsed_url is not None:
+            has_qualified_attributes = True
+
+        if parsed_url in disqualify_url:
+            continue  # Barrier to prevent processing None, etc.
+
+        # Merge path with domain if the URL is missing domain
+        if (not has_prefix(parsed_url)
+                and not is_qualified_email(parsed_url)
+                and not is_qualified_phone(parsed_url)):
+            parsed_url = get_merged_url(url, parsed_url)
+
+        # Add to URL class for preserving tree structure
+        if parsed_url not in parsed_set:
+            parsed_set.add(parsed_url)
+            parsed_list.append(parsed_url)
+
+    if not has_qualified_attributes and not response.is_truncated:
+        debug_header = 'No attributes detected'
+        debug_subheader = ('The tags were parsed from the URL, ' +
+                           'but no qualified attributes were detected')
+        debug_body = 'SOURCE:\n\n' + get_debug_source(code)
+
+        write_log(DebugInfo(url,
+                            debug_header,
+                            debug_subheader,
+                            debug_body))
+
+    return tuple(parsed_list)
+
+
+def get_qualified_attribute(attrs):
+    # Return value of the first qualify_attributes attribute in attrs
+    attribute_dict = {}
+
+    for name, value in attrs:
+        if value is None:  # Valueless attribute i.e. '<a href>'
+            value = ''
+
+        attribute_dict.setdefault(name, value)
+
+    for u in qualify_attributes:
+        if u in attribute_dict:
+            return attribute_dict[u]
+
+    return None
+
+
+def get_polite_delay(url):
+    # Reserve a request to the host of url, return seconds to wait for it
+    host = get_domain(url)
+
+    if not host_scheduler.has_robots(host):
+        host_scheduler.set_crawl_delay(host, get_crawl_delay(url))
+
+    return host_scheduler.get_reserved_delay(host)
+
+
+def get_proxy(scheme, host):
+    # Return split URL of the proxy for scheme and host, None if direct
+    # Taken from http_proxy, https_proxy and no_proxy, like urlopen() does
+    proxy = request.getproxies().get(scheme)
+
+    if proxy is None or request.proxy_bypass(host):
+        return None
+
+    if '://' not in proxy:
+        proxy = 'http://' + proxy
+
+    return parse.urlsplit(proxy)
+
+
+def get_rebuilt_link(url):
+    return get_canonical_url(url).url
+
+
+def get_seed_pairs(path):
+    # Yield (URL, depth) for each line of the seed file at path
+    # Depth is total_depth unless the line gives one, after a space
+    with open(path) as seed_file:
+        for line_number, line in enumerate(seed_file, 1):
+            field_list = line.split()
+
+            if not field_list or field_list[0].startswith('#'):
+                continue
+
+            if len(field_list) == 1:
+                yield field_list[0], total_depth
+            elif (len(field_list) == 2 and field_list[1].isdigit()
+                    and int(field_list[1]) > 0):
+                yield field_list[0], int(field_list[1])
+            else:
+                debug_header = 'Seed skipped'
+                debug_subheader = ('Line ' + str(line_number) + ' of ' +
+                                   path + ' is not a URL and a depth')
+                debug_body = line.rstrip('\n')
+
+                write_log(DebugInfo(None, debug_header, debug_subheader,
+                                    debug_body))
+
+
+def get_shared_config():
+    # Return config each of what run_job() keeps is built with for this
+    # job, None for what it has no use for
+    parse_config = {key: globals()[key] for key in parse_config_key_list}
+
+    return {'connection_pool': max_idle_connections,
+            'dns_cache': dns_resolvers if is_dns_cache else None,
+            'fetch_executor': max_concurrency if is_concurrent_mode else None,
+            'http_cache': cache_log_path if is_cache_mode else None,
+            'parse_executor': (json.loads(json.dumps(parse_config))
+                               if is_concurrent_mode and parse_processes > 0
+                               else None)}  # A copy, lists can change
+
+
+def get_simhash(code):  # Return 64-bit SimHash of code, None if too short
+    # Each distinct run of three words votes once, so boilerplate repeated
+    # on a page does not outweigh what sets it apart. Words are split on
+    # whitespace, markup and all, as the links in it are what a copy would
+    # be expanded to
+    # hash() differs by process, as does content_index, so that is fine
+    word_list = code.split()
+    shingle_set = set(map(hash, zip(word_list, word_list[1:],
+                                    word_list[2:])))
+
+    if not shingle_set:
+        return None
+
+    # Bit N of byte M of every shingle hash, counted a column at a time
+    hash_bytes = array('q', shingle_set).tobytes()
+    simhash_bytes = bytearray(8)
+
+    for byte in range(8):
+        column = hash_bytes[byte::8]
+
+        for bit in range(8):
+            if column.translate(bit_table_list[bit]).count(1) * 2 > len(
+                    shingle_set):
+                simhash_bytes[byte] |= 1 << bit
+
+    return int.from_bytes(simhash_bytes, sys.byteorder)
+
+
+def get_stripped_email(email):  # Return raw email
+    # i.e. 'email@example.com' instead of 'mailto:email@example.com'
+    str_to_remove = ['mailto:', ' ']
+
+    for u in str_to_remove:
+        email = email.replace(u, '')
+
+    return email
+
+
+def get_stripped_phone(phone):  # Return raw phone
+    # i.e. '1234567890' instead of '(123) 456-7890' or 'tel:1234567890'
+    str_to_remove = ['tel:', '(', ')', '-', '.', ' ']
+
+    for u in str_to_remove:
+        phone = phone.replace(u, '')
+
+    return phone
+
+
+def get_tag_list(url, soup):  # Return a list of links
+    # Only webpages are parsed into soup, FTP listings go to get_ftp_parse()
+    return soup.findAll(qualify_tags)
+
+
+def get_text_contact_list(code):
+    # Return 'mailto:' and 'tel:' items for contacts written in raw code
+    # Scans the bytes for each anchor once, the soup is never walked
+    contact_list = []
+
+    for match in email_pattern.finditer(code):
+        start = match.start()
+        head = code[max(start - 65, 0):start]
+        local_size = len(head) - len(head.rstrip(email_local_chars))
+
+        if local_size == 0 or local_size > 64:
+            continue
+
+        email = str(code[start - local_size:match.end()], 'ascii')
+
+        if not email.lower().endswith(tuple(disqualify_email_endings)):
+            contact_list.append('mailto:' + email)
+
+    for match in phone_pattern.finditer(code.translate(phone_fold_table)):
+        start = match.start() + 1
+        head = phone_head_pattern.search(code, max(start - 20, 0), start)
+
+        if head and not phone_tail_pattern.match(code, match.end()):
+            contact_list.append(
+                'tel:' + str(code[head.start():match.end()], 'ascii'))
+
+    return contact_list
+
+
+def get_resolved_path(path):  # Return path with '.' and '..' resolved
+    if '.' not in path:
+        return path
+
+    segment_list = []
+
+    for segment in path.split('/'):
+        if segment == '..':
+            if len(segment_list) > 1:  # Never above the root
+                segment_list.pop()
+        elif segment != '.':
+            segment_list.append(segment)
+
+    if path.endswith('/.') or path.endswith('/..'):
+        segment_list.append('')  # Still a folder
+
+    return '/'.join(segment_list)
+
+
+def get_resolved_socket(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                        source_address=None):
+    # Stands in for socket.create_connection() on pooled connections,
+    # resolving through dns_cache, and timing the DNS lookup and the
+    # connect as stages of their own
+    host, port = address
+    span_time = (time.perf_counter() if metrics is not None
+                 else None)
+
+    if dns_cache is not None:
+        address_list = dns_cache.get_address_list(host)
+    else:
+        address_list = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+
+    if metrics is not None:
+        metrics.add_span('dns', span_time)
+        span_time = time.perf_counter()
+
+    for i, (_, _, _, _, socket_address) in enumerate(address_list):
+        try:  # Resolved already, so each try only connects
+            connection = socket.create_connection(
+                (socket_address[0], port), timeout, source_address)
+        except OSError:
+            if i == len(address_list) - 1:
+                raise
+        else:
+            if metrics is not None:
+                metrics.add_span('connect', span_time)
+
+            return connection
+
+
+def get_worker_index(url):  # Return the worker the host of url belongs to
+    return zlib.crc32(get_domain(url).encode()) % worker_count
+
+
+def get_worker_log_path(path, index):  # Return path of worker index's log
+    log_root, log_extension = os.path.splitext(path)
+
+    return log_root + '_worker-' + str(index) + log_extension
+
+
+def has_prefix(url):
+    return '://' in url or url.startswith('//')
+
+
+def is_beta_url(url, depth):
+    # URLs that are both on the og domain,
+    # as well as at the second-highest depth or higher
+    # (beginning of the rabbit holes basically)
+    return total_depth <= (depth + 1)
+
+
+def is_crawl_target(url, depth):
+    # Crawl if depth allows it, and on og domain
+    bare_url = get_canonical_url(url).bare_url
+
+    return (depth > 1
+            and is_qualified_crawl_url(url)
+            and bare_url.startswith(og_url_domain)
+            and bare_url != get_canonical_url(og_url).bare_url)
+
+
+def is_ftp(url):
+    if url.startswith('ftp://') or url.startswith('ftps://'):
+        return True
+
+    return False
+
+
+def is_html_parse(url):
+    # Not FTP, or is FTP with webfile (.html, etc.)
+    if not is_ftp(url):
+        return True
+
+    return is_web_file(url)
+
+
+def is_html_content(content_type):  # Unknown types are read as HTML
+    if not content_type:
+        return True
+
+    return content_type.split(';')[0].strip().lower() in html_content_types
+
+
+def is_not_modified(check_link, url_class, response):
+    # On a 304 for a cached page, fill url_class from http_cache
+    if http_cache is None:
+        return False
+
+    return http_cache.set_not_modified(check_link, url_class, response)
+
+
+def is_qualified_crawl_url(url):
+    # Return boolean on whether the passed URL is crawlable or not
+    # (i.e. not a mailto: or .mp3 file)
+    canonical_url = get_canonical_url(url)
+    check_url = canonical_url.bare_url
+
+    if check_url.endswith('..'):  # Back links
+        return False
+
+    for u in disqualify_endings:
+        if check_url.endswith(u):
+            return False
+
+    for u in disqualify_beginnings:
+        if url.startswith(u):
+            return False
+
+    # After removing the domain, prefix, and any '/.'
+    # (i.e. unix hidden folders/files),
+    # if there's a '.' left check like a file extension
+    check_url = check_url[len(canonical_url.domain):].replace('/.', '')
+
+    if '.' in check_url:
+        return is_web_file(url)
+
+    return True
+
+
+def is_qualified_email(url):
+    # Return boolean on whether the passed item is a valid email or not
+    if url.startswith('mailto:') and url != 'mailto:':
+        return True
+
+    return False
+
+
+def is_qualified_phone(url):
+    # Return boolean on whether the passed item is a valid phone number or not
+    if url.startswith('tel:') and url != 'tel:':
+        return True
+
+    return False
+
+
+def is_web_file(url):
+    # Return: URL ends with one of the extensions in qualify_endings
+    if url.endswith('/'):
+        url = url[:-1]  # Remove last '/' if applicable
+
+    for ending in qualify_endings:
+        if url.endswith(ending):
+            return True
+
+    return False
+
+
+def put_crawl_target(frontier, depth_dict, url, depth):
+    # Queue url, unless it is queued or was crawled at depth or higher
+    check_link = get_canonical_url(url).check_link
+    queued_depth = depth_dict.get(check_link)
+
+    if queued_depth is None:  # Expand past the depth of a previous seed
+        url_class = url_dict.get(check_link)
+        queued_depth = 0 if url_class is None else url_class.depth
+
+    if depth > queued_depth:
+        depth_dict[check_link] = depth
+        frontier.put_nowait((url, depth))
+        add_dns_prefetch(url)
+
+
+def run_job(url_list, is_resumed=False):
+    # Crawl each seed in url_list as one job, and return its job stats
+    # Starts the pools and executors close_shared() stops, if not yet up
+    global connection_pool, content_index, debug_log, debug_log_path
+    global dns_cache, email_index, email_log, email_log_path
+    global fetch_executor, graph_writer
+    global host_scheduler, http_cache, is_concurrent_mode, is_save_mode
+    global is_scrape_mode, job_stats, log_writer, metrics, page_store
+    global parse_executor, phone_index, phone_log, phone_log_path
+    global prefetch_dict, redundancy_level, resumed_count
+    global shared_config_dict, source_index_log, source_log
+    global start_time, total_depth, url_dict, url_input_list, url_log
+    global url_log_index, url_log_path
+
+    url_input_list = url_list
+
+    # Open state store if applicable
+    if worker_count > 0:  # Shared by the worker processes
+        page_store = WorkerStore(state_log_dir + job_id + '.sqlite')
+    elif is_persistent_mode:
+        page_store = CrawlStore(state_log_dir + job_id + '.sqlite')
+
+    if page_store is not None:
+        if is_resumed:
+            config_dict = page_store.get_config()
+            url_input_list = config_dict['url_input_list']
+            total_depth = config_dict['total_depth']
+            is_scrape_mode = config_dict['is_scrape_mode']
+            is_save_mode = config_dict['is_save_mode']
+            redundancy_level = config_dict['redundancy_level']
+            is_concurrent_mode = config_dict['is_concurrent_mode']
+            resumed_count = page_store.get_resumed()
+        else:
+            page_store.set_config({'url_input_list': url_input_list,
+                                   'total_depth': total_depth,
+                                   'is_scrape_mode': is_scrape_mode,
+                                   'is_save_mode': is_save_mode,
+                                   'redundancy_level': redundancy_level,
+                                   'is_concurrent_mode': is_concurrent_mode})
+
+        url_dict = StoreDict(page_store, 'url')
+        prefetch_dict = StoreDict(page_store, 'prefetch')
+
+    # Open log files if applicable
+    log_writer = LogWriter(log_queue_size, log_batch_size)
+    job_header = 'JobID: ' + job_id + '\n\n'
+
+    if is_ndjson_mode:  # Same logs, one JSON object per line
+        debug_log_path, url_log_path, email_log_path, phone_log_path = [
+            path[:-len('.txt')] + '.ndjson' for path in
+            [debug_log_path, url_log_path, email_log_path, phone_log_path]]
+        job_header = json.dumps({'job_id': job_id}) + '\n'
+
+    debug_log = open(debug_log_path, 'w+')
+    write_file(debug_log, job_header)
+
+    if is_save_mode:
+        url_log = open(url_log_path, 'w+')
+        write_file(url_log, job_header)
+
+        if is_scrape_mode:
+            email_log = open(email_log_path, 'w+')
+            write_file(email_log, job_header)
+            phone_log = open(phone_log_path, 'w+')
+            write_file(phone_log, job_header)
+
+    if is_keep_source:  # Offset, size and URL of each source, a line each
+        source_log = open(source_log_path, 'wb')
+        source_index_log = open(source_index_log_path, 'w')
+
+    # What was kept from a job with other config is built again
+    config_dict = get_shared_config()
+    close_shared([key for key, value in config_dict.items()
+                  if value != shared_config_dict.get(key)])
+    shared_config_dict = config_dict
+
+    if is_cache_mode and http_cache is None:  # Kept for the next job
+        http_cache = HTTPCache(cache_log_path)
+
+    if is_polite_mode:
+        host_scheduler = HostScheduler(host_rate, host_burst)
+
+    if is_graph_mode:
+        graph_writer = GraphWriter(graph_log_path, graph_format)
+
+    if is_content_dedup:
+        content_index = ContentIndex(simhash_distance)
+
+    if is_metrics_mode:  # No path shows a status line instead
+        metrics = Metrics(metrics_log_path if metrics_output == 'file'
+                          else None)
+
+    # Begin crawling/scraping
+    if connection_pool is None:
+        connection_pool = ConnectionPool(max_idle_connections)
+
+    if is_dns_cache and dns_cache is None:  # Kept for the next job
+        dns_cache = DNSCache(dns_resolvers)
+
+    email_index = DedupIndex()
+    phone_index = DedupIndex()
+    url_log_index = DedupIndex(is_compact_dedup)
+
+    if is_concurrent_mode and fetch_executor is None:
+        fetch_executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    if (is_concurrent_mode and parse_processes > 0
+            and parse_executor is None):
+        # Spawned, as a fork would copy the log, DNS and metrics threads
+        parse_executor = ProcessPoolExecutor(
+            max_workers=parse_processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=set_crawl_config,
+            initargs=(config_dict['parse_executor'],))
+
+    start_time = datetime.now()
+    debug_header = 'Starting crawl job'
+    debug_subheader = 'START: ' + str(datetime.utcnow()) + ' UTC'
+    debug_body = ('CONFIG:' +
+                  '\ntotal_depth = ' + str(total_depth) +
+                  '\nscrape = ' + str(is_scrape_mode) +
+                  '\ntext_scrape = ' + str(is_text_scrape_mode) +
+                  '\nsave = ' + str(is_save_mode) +
+                  '\nredundancy_level = ' + str(redundancy_level) +
+                  '\nprint_level = ' + str(print_level) +
+                  '\nconcurrent = ' + str(is_concurrent_mode) +
+                  '\nmax_concurrency = ' + str(max_concurrency) +
+                  '\nmax_idle_connections = ' + str(max_idle_connections) +
+                  '\nmax_body_size = ' + str(max_body_size) +
+                  '\ndns_cache = ' + str(is_dns_cache) +
+                  '\ndns_ttl = ' + str(dns_ttl) +
+                  '\ndns_negative_ttl = ' + str(dns_negative_ttl) +
+                  '\ncompact_dedup = ' + str(is_compact_dedup) +
+                  '\nparse_processes = ' + str(parse_processes) +
+                  '\npersistent = ' + str(is_persistent_mode) +
+                  '\nresumed_pages = ' + str(resumed_count) +
+                  '\ncache = ' + str(is_cache_mode) +
+                  '\nndjson = ' + str(is_ndjson_mode) +
+                  '\ngraph = ' + str(is_graph_mode) +
+                  '\ngraph_format = ' + str(graph_format) +
+                  '\ncontent_dedup = ' + str(is_content_dedup) +
+                  '\nsimhash_distance = ' + str(simhash_distance) +
+                  '\ndebug_source_size = ' + str(debug_source_size) +
+                  '\npolite = ' + str(is_polite_mode) +
+                  '\nhost_rate = ' + str(host_rate) +
+                  '\nhost_burst = ' + str(host_burst) +
+                  '\nworker_count = ' + str(worker_count) +
+                  '\nmetrics = ' + str(is_metrics_mode) +
+                  '\nmetrics_output = ' + str(metrics_output) +
+                  '\nseed_file = ' + str(seed_file_path) +
+                  '\nmax_active_seeds = ' + str(max_active_seeds) +
+                  '\nseed_page_budget = ' + str(seed_page_budget) +
+                  '\nurl_input_list =' +
+                  '\n' + tab + ('\n' + tab).join(map(str, url_input_list)))
+
+    write_log(DebugInfo(None, debug_header, debug_subheader, debug_body))
+
+    try:
+        if worker_count > 0:  # Every seed at once, split over the workers
+            crawl_workers(url_input_list, total_depth)
+
+        for link in url_input_list:  # Crawl for each URL the user inputs
+            set_og_url(link)
+
+            # Fetch breadth first, then log the tree in order
+            if worker_count == 0:
+                asyncio.run(crawl_async(link, total_depth))
+
+            crawl(link, total_depth)
+            write_end_crawl(link)
+
+        if seed_file_path is not None:  # Each seed is logged as it finishes
+            asyncio.run(crawl_seed_file(seed_file_path))
+
+        # Links of copies no other page led to, before page_store closes
+        saved_count = sum(1 for check_link in duplicate_link_set
+                          if check_link not in url_dict)
+    finally:  # Keep what was crawled so far, even on Ctrl-C
+        log_writer.join()
+
+        if page_store is not None:
+            page_store.close()
+
+        if graph_writer is not None:  # A partial crawl is still a graph
+            graph_writer.close()
+
+        if metrics is not None:
+            metrics.close()
+
+    if print_level > 0:
+        if is_scrape_mode:
+            print('\n\nEmails:')
+            print('\n'.join(map(str, email_list)))
+
+            print('\n\nPhone Numbers:')
+            print('\n'.join(map(str, phone_list)))
+
+    total_seconds = timedelta.total_seconds(datetime.now() - start_time)
+    host_stats = ''
+
+    if host_scheduler is not None:
+        for host, count in host_scheduler.count_dict.items():
+            host_stats += ('Host ' + host + ': ' + str(count[0]) +
+                           ' requests, ' +
+                           str(host_scheduler.get_request_rate(host)) +
+                           ' requests/sec\n')
+
+    stage_stats = metrics.get_stats_output() if metrics is not None else ''
+    job_stats = (
+        '**Job Stats**\n' +
+        'Errors: ' + str(error_count) + '\n' +
+        'Pages: ' + str(page_count) + '\n' +
+        'Pages/sec: ' + str(round(page_count / max(total_seconds, 1e-6), 2)) +
+        '\n' +
+        'Pool hits: ' + str(connection_pool.hit_count) + '\n' +
+        'Pool misses: ' + str(connection_pool.miss_count) + '\n' +
+        'DNS hits: ' + str(getattr(dns_cache, 'hit_count', 0)) + '\n' +
+        'DNS misses: ' + str(getattr(dns_cache, 'miss_count', 0)) + '\n' +
+        'DNS prefetches: ' + str(getattr(dns_cache, 'prefetch_count', 0)) +
+        '\n' +
+        'DNS failures: ' + str(getattr(dns_cache, 'failed_count', 0)) + '\n' +
+        'DNS resolving: ' + str(round(
+            getattr(dns_cache, 'resolve_seconds', 0), 3)) + ' seconds\n' +
+        'DNS waited on: ' + str(round(
+            getattr(dns_cache, 'wait_seconds', 0), 3)) + ' seconds\n' +
+        'Resumed pages: ' + str(resumed_count) + '\n' +
+        'Bulk seeds: ' + str(seed_count) + '\n' +
+        'Duplicate pages: ' + str(duplicate_count) + '\n' +
+        'Near duplicate pages: ' + str(near_duplicate_count) + '\n' +
+        'Duplicate links not expanded: ' + str(len(duplicate_link_set)) +
+        '\n' +
+        'Fetches saved: ' + str(saved_count) + '\n' +
+        'Canonical cache hit rate: ' + str(round(
+            canonical_hit_count /
+            max(canonical_hit_count + canonical_miss_count, 1) * 100, 2)) +
+        '%\n' +
+        'Graph nodes: ' + str(len(getattr(graph_writer, 'node_dict', ()))) +
+        '\n' +
+        'Graph edges: ' + str(getattr(graph_writer, 'edge_count', 0)) + '\n' +
+        'Bytes on wire: ' + str(wire_bytes) + '\n' +
+        'Bytes decoded: ' + str(decoded_bytes) + '\n' +
+        'Skipped bodies: ' + str(skipped_count) + '\n' +
+        'Truncated bodies: ' + str(truncated_count) + '\n' +
+        'Cache hits: ' + str(getattr(http_cache, 'hit_count', 0)) + '\n' +
+        'Cache misses: ' + str(getattr(http_cache, 'miss_count', 0)) + '\n' +
+        'Cache bytes saved: ' + str(getattr(http_cache, 'saved_bytes', 0)) +
+        '\n' +
+        host_stats +
+        stage_stats +
+        str(total_seconds) + ' seconds\n' +
+        'Timestamp: ' + timestamp
+        )
+
+    print('\n\n\n' + job_stats)
+    print('JobID: ' + job_id)
+
+    if is_ndjson_mode:
+        write_file(debug_log, json.dumps({'job_stats': job_stats}) + '\n')
+    else:
+        write_file(debug_log, job_stats)
+
+    log_writer.close()
+
+    for log_file in [debug_log, url_log, email_log, phone_log, source_log,
+                     source_index_log]:
+        if log_file is not None:
+            log_file.close()
+
+    return job_stats
+
+
+def run_worker(store_path, index):
+    # Run worker index of crawl_workers(), in a process of its own
+    # The job is read from the WorkerStore at store_path, and the pages go
+    # back to it, only debug entries are logged here
+    global connection_pool, content_index, debug_log, dns_cache
+    global fetch_executor, host_scheduler, log_writer, page_store
+    global prefetch_dict, source_index_log, source_log, store_cache_size
+    global url_dict
+
+    page_store = WorkerStore(store_path)
+    set_crawl_config(page_store.get_config()['worker_config'])
+
+    store_cache_size = 0  # The other workers write the same keys
+    url_dict = StoreDict(page_store, 'url')
+    prefetch_dict = StoreDict(page_store, 'prefetch')
+    connection_pool = ConnectionPool(max_idle_connections)
+    dns_cache = DNSCache(dns_resolvers) if is_dns_cache else None
+    log_writer = LogWriter(log_queue_size, log_batch_size)
+    debug_log = open(get_worker_log_path(debug_log_path, index), 'w+')
+
+    if is_ndjson_mode:
+        write_file(debug_log, json.dumps({'job_id': job_id,
+                                          'worker': index}) + '\n')
+    else:
+        write_file(debug_log, 'JobID: ' + job_id +
+                   '\nWorker: ' + str(index) + '\n\n')
+
+    if is_keep_source:  # A spill and its index per worker, like debug_log
+        source_log = open(get_worker_log_path(source_log_path, index), 'wb')
+        source_index_log = open(
+            get_worker_log_path(source_index_log_path, index), 'w')
+
+    if is_polite_mode:  # Each host is crawled by one worker, so still exact
+        host_scheduler = HostScheduler(host_rate, host_burst)
+
+    if is_content_dedup:  # Copies are found within the hosts of the worker
+        content_index = ContentIndex(simhash_distance)
+
+    if is_concurrent_mode:
+        fetch_executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    try:
+        asyncio.run(crawl_frontier(WorkerQueue(page_store, index),
+                                   StoreDict(page_store, 'depth')))
+    finally:
+        page_store.set_stats(index, {
+            'canonical_hit_count': canonical_hit_count,
+            'canonical_miss_count': canonical_miss_count,
+            'debug_count': debug_count,
+            'decoded_bytes': decoded_bytes,
+            'duplicate_count': duplicate_count,
+            'error_count': error_count,
+            'near_duplicate_count': near_duplicate_count,
+            'page_count': page_count,
+            'skipped_count': skipped_count,
+            'truncated_count': truncated_count,
+            'wire_bytes': wire_bytes,
+            'pool_hit_count': connection_pool.hit_count,
+            'pool_miss_count': connection_pool.miss_count,
+            'duplicate_links': list(duplicate_link_set),
+            'dns_stats': [getattr(dns_cache, key, 0)
+                          for key in dns_stat_key_list]})
+
+        log_writer.close()
+        debug_log.close()
+        connection_pool.close()
+        page_store.close()
+
+        for log_file in [source_log, source_index_log]:
+            if log_file is not None:
+                log_file.close()
+
+        if dns_cache is not None:
+            dns_cache.close()
+
+        if fetch_executor is not None:
+            fetch_executor.shutdown()
+
+
+def set_crawl_config(config_dict):  # Set the module config of each key
+    for key, value in config_dict.items():
+        globals()[key] = value
+
+
+def set_duplicate(url, url_class, code):
+    # Mark url_class a copy of the page content_index has with its code
+    global duplicate_count, near_duplicate_count
+
+    if content_index is None or not code or not is_html_parse(url):
+        return  # FTP folders listing the same names hold other files
+
+    copy = content_index.add(url_class.log_url, url_class.content_hash,
+                             get_simhash(code))
+
+    if copy is None:
+        return
+
+    url_class.duplicate_of, is_exact = copy
+
+    if is_exact:
+        duplicate_count += 1
+        url_class.log_entry = 'Duplicate of ' + url_class.duplicate_of
+    else:
+        near_duplicate_count += 1
+        url_class.log_entry = 'Near duplicate of ' + url_class.duplicate_of
+
+
+def set_host_backoff(url, response):
+    # Hold off the host of url after 429 or 503, for Retry-After if sent
+    if host_scheduler is None or response.status not in [429, 503]:
+        return
+
+    retry_after = response.headers.get('Retry-After', '')
+    seconds = int(retry_after) if retry_after.isdigit() else 1 / host_rate
+
+    host_scheduler.set_backoff(get_domain(url), seconds)
+
+
+def set_job(resumed_job_id=None):
+    # Start a new job, with its own JobID, log paths and crawl state
+    # What run_job() keeps between jobs is left as it is
+    global canonical_cache_dict, canonical_hit_count, canonical_miss_count
+    global debug_count, decoded_bytes, duplicate_count, duplicate_link_set
+    global error_count, near_duplicate_count, page_count, resumed_count
+    global seed_budget_dict, seed_count, skipped_count, truncated_count
+    global wire_bytes
+    global content_index, debug_log, debug_log_path, email_index
+    global email_list, email_log, email_log_path, graph_log_path
+    global graph_writer, host_scheduler, job_id, job_stats, log_writer
+    global metrics, metrics_log_path, og_url, og_url_domain, page_store
+    global phone_index, phone_list, phone_log, phone_log_path
+    global prefetch_dict, source_index_log, source_index_log_path
+    global source_log, source_log_path, start_time, timestamp, url_dict
+    global url_input_list, url_log, url_log_index, url_log_path
+
+    job_id = resumed_job_id or str(uuid.uuid4())
+    timestamp = datetime.now().strftime('%Y-%m-%d-%H-%M-%S')
+
+    debug_log_path = (default_log_path + '1-debug/' +
+                      'debug_' + timestamp + '.txt')
+    url_log_path = default_log_path + '2-url/' + 'url_' + timestamp + '.txt'
+    email_log_path = (default_log_path + '3-email/' +
+                      'email_' + timestamp + '.txt')
+    phone_log_path = (default_log_path + '4-phone/' +
+                      'phone_' + timestamp + '.txt')
+    source_log_path = (default_log_path + '1-debug/' +
+                       'source_' + timestamp + '.bin')
+    source_index_log_path = (default_log_path + '1-debug/' +
+                             'source_' + timestamp + '.tsv')
+    graph_log_path = (default_log_path + '7-graph/' +
+                      'graph_' + timestamp + '/')
+    metrics_log_path = (default_log_path + '8-metrics/' +
+                        'metrics_' + timestamp + '.prom')
+
+    url_dict = {}
+    email_list = []
+    phone_list = []
+    prefetch_dict = {}
+    canonical_cache_dict = OrderedDict()  # Misses log back link errors
+    seed_budget_dict = {}
+    duplicate_link_set = set()
+
+    canonical_hit_count = 0
+    canonical_miss_count = 0
+    debug_count = 0
+    duplicate_count = 0
+    error_count = 0
+    near_duplicate_count = 0
+    page_count = 0
+    resumed_count = 0
+    seed_count = 0
+    decoded_bytes = 0
+    skipped_count = 0
+    truncated_count = 0
+    wire_bytes = 0
+
+    job_stats = ''
+    og_url = ''
+    og_url_domain = ''
+
+    content_index = None
+    debug_log = email_log = phone_log = source_log = url_log = None
+    source_index_log = None
+    email_index = phone_index = url_log_index = None
+    graph_writer = host_scheduler = log_writer = metrics = None
+    page_store = start_time = url_input_list = None
+
+    if connection_pool is not None:  # Kept, but counted per job
+        connection_pool.hit_count = connection_pool.miss_count = 0
+
+    if dns_cache is not None:
+        for key in dns_stat_key_list:
+            setattr(dns_cache, key, 0)
+
+    if http_cache is not None:
+        http_cache.hit_count = http_cache.miss_count = 0
+        http_cache.saved_bytes = 0
+
+
+def set_og_url(url):  # Scope crawling to the domain of seed url
+    global og_url, og_url_domain
+
+    og_url = url
+    og_url_domain = get_domain(url)
+
+
+async def wait_for_host(url):
+    # Async get_polite_delay(), robots.txt of a host is fetched only once
+    host = get_domain(url)
+
+    if not host_scheduler.has_robots(host):
+        robots_future = host_scheduler.robots_dict.get(host)
+
+        if robots_future is None:
+            robots_future = asyncio.get_running_loop().run_in_executor(
+                fetch_executor, get_crawl_delay, url)
+            host_scheduler.robots_dict[host] = robots_future
+
+        host_scheduler.set_crawl_delay(host, await robots_future)
+
+    await asyncio.sleep(host_scheduler.get_reserved_delay(host))
+
+
+def write_end_crawl(url):  # Close the tree of seed url in the URL log
+    if is_save_mode and is_ndjson_mode:
+        write_file(url_log, json.dumps({'end_crawl': url}) + '\n')
+    elif is_save_mode:
+        write_file(url_log, 'END CRAWL: ' + url + '\n\n')
+
+
+def write_file(log_file, text):  # Write through log_writer if there is one
+    if log_writer is None:
+        log_file.write(text)
+    else:
+        log_writer.write(log_file, text)
+
+
+def write_link_log(url, depth):  # Log a link crawl() does not walk
+    if is_qualified_email(url):
+        write_log(Email(url))
+    elif is_qualified_phone(url):
+        write_log(Phone(url))
+    else:
+        write_log(URL(url, depth))
+
+
+def write_log(entry):
+    span_time = (time.perf_counter() if metrics is not None
+                 else None)
+
+    if type(entry) is DebugError or type(entry) is DebugInfo:
+        if print_level > 1:
+            print(entry.get_print_output())
+
+        write_file(debug_log, get_log_line(entry))
+    elif type(entry) is URL or type(entry) is URLView:
+        is_qualified_log = False
+        is_qualified_print = False
         is_unique = False
 
-        if get_check_link(entry.url) not in url_log_list:
+        if url_log_index.add(get_check_link(entry.url)):
             is_unique = True
-            url_log_list.append(get_check_link(entry.url))
 
         if redundancy_level == 0:
             is_qualified_log = is_save_mode and is_unique
@@ -663,189 +3904,191 @@ def write_log(entry):
             print(entry.get_print_output())
 
         if is_qualified_log:
-            url_log.write(entry.get_log_output() + '\n')
+            write_file(url_log, get_log_line(entry))
     elif type(entry) is Email:
-        if is_scrape_mode and entry.email not in email_list:
+        if is_scrape_mode and email_index.add(entry.email):
             email_list.append(entry.get_print_output())
 
             if is_save_mode:
-                email_log.write(entry.get_log_output() + '\n')
+                write_file(email_log, get_log_line(entry))
 
     elif type(entry) is Phone:
-        if is_scrape_mode and (entry.phone not in phone_list):
+        if is_scrape_mode and phone_index.add(entry.phone):
             phone_list.append(entry.get_print_output())
 
             if is_save_mode:
-                phone_log.write(entry.get_log_output() + '\n')
+                write_file(phone_log, get_log_line(entry))
 
+    if metrics is not None:
+        metrics.add_span('log', span_time)
 
-# START MAIN CODE
 
-# Get user variables
-while True:
-    url_input_list = input(
-        '\nPlease enter the target URL(s), separated by spaces:\n').split(' ')
+set_job()  # The first job, a Crawler starts another for each crawl
 
-    if url_input_list == ['']:
-        print("\n***\nINVALID INPUT\n***\n")
-        continue
-    break
 
-while True:
-    total_depth_input = input(
-        '\nPlease enter how many levels deep to crawl (default = 4):\n')
+# START MAIN CODE
 
-    if total_depth_input == '':
-        break
-    else:
-        try:
-            if int(total_depth_input) > 0:
-                total_depth = int(total_depth_input)
-                break
-            else:
-                print("\n***\nINVALID INPUT\n***\n")
-                continue
-        except Exception:
+if __name__ == '__main__':  # Keep parse_executor processes prompt-free
+    # Get user variables, prompted for unless passed on the command line
+    url_input_list, resume_job_id, config_dict = get_cli_config(
+        sys.argv[1:])
+    is_interactive = len(sys.argv) == 1
+    is_resumed = resume_job_id is not None
+
+    set_crawl_config(config_dict)
+
+    if is_resumed:
+        set_job(resume_job_id)
+
+    while is_interactive and is_persistent_mode:
+        resume_input = input(
+            '\nPlease enter a JobID to resume, ' +
+            'or leave blank to start a new job:\n')
+
+        if resume_input == '':
+            break
+        elif os.path.isfile(state_log_dir + resume_input + '.sqlite'):
+            set_job(resume_input)
+            is_resumed = True
+            break
+        else:
             print("\n***\nINVALID INPUT\n***\n")
             continue
 
-while True:
-    scrape_mode_input = input(
-        '\n' +
-        'Do you want to scrape for emails and phone numbers?\n' +
-        'y: yes (Default)\n' +
-        'n: no\n')
+    # A resumed job keeps its stored config
+    while is_interactive and not is_resumed:
+        url_input_list = input(
+            '\nPlease enter the target URL(s), separated by spaces:\n'
+        ).split(' ')
 
-    if scrape_mode_input == '':
-        break
-    elif (scrape_mode_input.lower().startswith('y') or
-            scrape_mode_input.lower().startswith('n')):
-        is_scrape_mode = scrape_mode_input.lower().startswith('y')
+        if url_input_list == ['']:
+            print("\n***\nINVALID INPUT\n***\n")
+            continue
         break
-    else:
-        print("\n***\nINVALID INPUT\n***\n")
-        continue
-
-while True:
-    save_mode_input = input(
-        '\n' +
-        'Would you like to save all data to files in the /logs folder?\n' +
-        'y: yes (Default)\n' +
-        'n: no\n')
 
-    if save_mode_input == '':
-        break
-    elif (save_mode_input.lower().startswith('y') or
-            save_mode_input.lower().startswith('n')):
-        is_save_mode = save_mode_input.lower().startswith('y')
-        break
-    else:
-        print("\n***\nINVALID INPUT\n***\n")
-        continue
+    while is_interactive and not is_resumed:
+        total_depth_input = input(
+            '\nPlease enter how many levels deep to crawl (default = 4):\n')
 
-while True:
-    redundancy_level_input = input(
-        '\n' +
-        'Please select a level of redundancy:\n' +
-        ' Unique will log each URL in a list once and only once.\n' +
-        ' Standard will log a tree while skipping already crawled URLs.\n' +
-        ' Redundant will log the full tree including already crawled URLs.\n' +
-        '0: Unique (Default)\n' +
-        '1: Standard\n' +
-        '2: Redundant\n')
-
-    if redundancy_level_input == '':
-        break
-    else:
-        try:
-            if (int(redundancy_level_input) >= 0 and
-                    int(redundancy_level_input) <= 2):
-                redundancy_level = int(redundancy_level_input)
-                break
-            else:
+        if total_depth_input == '':
+            break
+        else:
+            try:
+                if int(total_depth_input) > 0:
+                    total_depth = int(total_depth_input)
+                    break
+                else:
+                    print("\n***\nINVALID INPUT\n***\n")
+                    continue
+            except Exception:
                 print("\n***\nINVALID INPUT\n***\n")
                 continue
-        except Exception:
+
+    while is_interactive and not is_resumed:
+        scrape_mode_input = input(
+            '\n' +
+            'Do you want to scrape for emails and phone numbers?\n' +
+            'y: yes (Default)\n' +
+            'n: no\n')
+
+        if scrape_mode_input == '':
+            break
+        elif (scrape_mode_input.lower().startswith('y') or
+                scrape_mode_input.lower().startswith('n')):
+            is_scrape_mode = scrape_mode_input.lower().startswith('y')
+            break
+        else:
             print("\n***\nINVALID INPUT\n***\n")
             continue
 
-while True:
-    print_level_input = input(
-        '\n' +
-        'Please select an output display option:\n' +
-        '0: Quiet\n' +
-        '1: Standard (Default)\n' +
-        '2: Verbose\n')
+    while is_interactive and not is_resumed:
+        save_mode_input = input(
+            '\n' +
+            'Would you like to save all data to files in the /logs folder?\n' +
+            'y: yes (Default)\n' +
+            'n: no\n')
+
+        if save_mode_input == '':
+            break
+        elif (save_mode_input.lower().startswith('y') or
+                save_mode_input.lower().startswith('n')):
+            is_save_mode = save_mode_input.lower().startswith('y')
+            break
+        else:
+            print("\n***\nINVALID INPUT\n***\n")
+            continue
 
-    if print_level_input == '':
-        break
-    else:
-        try:
-            if (int(print_level_input) >= 0 and
-                    int(print_level_input) <= 2):
-                print_level = int(print_level_input)
-                break
-            else:
+    while is_interactive and not is_resumed:
+        redundancy_level_input = input(
+            '\n' +
+            'Please select a level of redundancy:\n' +
+            ' Unique will log each URL in a list once and only once.\n' +
+            ' Standard will log a tree while skipping already crawled URLs.' +
+            '\n' +
+            ' Redundant will log the full tree including already crawled ' +
+            'URLs.\n' +
+            '0: Unique (Default)\n' +
+            '1: Standard\n' +
+            '2: Redundant\n')
+
+        if redundancy_level_input == '':
+            break
+        else:
+            try:
+                if (int(redundancy_level_input) >= 0 and
+                        int(redundancy_level_input) <= 2):
+                    redundancy_level = int(redundancy_level_input)
+                    break
+                else:
+                    print("\n***\nINVALID INPUT\n***\n")
+                    continue
+            except Exception:
                 print("\n***\nINVALID INPUT\n***\n")
                 continue
-        except Exception:
+
+    while is_interactive and not is_resumed:
+        concurrent_mode_input = input(
+            '\n' +
+            'Please select a crawl engine:\n' +
+            ' Sequential fetches one page at a time.\n' +
+            ' Concurrent fetches up to ' + str(max_concurrency) +
+            ' pages at a time.\n' +
+            '0: Sequential (Default)\n' +
+            '1: Concurrent\n')
+
+        if concurrent_mode_input == '':
+            break
+        elif concurrent_mode_input in ['0', '1']:
+            is_concurrent_mode = concurrent_mode_input == '1'
+            break
+        else:
             print("\n***\nINVALID INPUT\n***\n")
             continue
 
+    while is_interactive:
+        print_level_input = input(
+            '\n' +
+            'Please select an output display option:\n' +
+            '0: Quiet\n' +
+            '1: Standard (Default)\n' +
+            '2: Verbose\n')
 
-# Open log files if applicable
-debug_log = open(debug_log_path, 'w+')
-debug_log.write('JobID: ' + job_id + '\n\n')
-
-if is_save_mode:
-    url_log = open(url_log_path, 'w+')
-    url_log.write('JobID: ' + job_id + '\n\n')
-
-    if is_scrape_mode:
-        email_log = open(email_log_path, 'w+')
-        email_log.write('JobID: ' + job_id + '\n\n')
-        phone_log = open(phone_log_path, 'w+')
-        phone_log.write('JobID: ' + job_id + '\n\n')
-
-# Begin crawling/scraping
-start_time = datetime.now()
-debug_header = 'Starting crawl job'
-debug_subheader = 'START: ' + str(datetime.utcnow()) + ' UTC'
-debug_body = ('CONFIG:' +
-              '\ntotal_depth = ' + str(total_depth) +
-              '\nscrape = ' + str(is_scrape_mode) +
-              '\nsave = ' + str(is_save_mode) +
-              '\nredundancy_level = ' + str(redundancy_level) +
-              '\nprint_level = ' + str(print_level) +
-              '\nurl_input_list =' +
-              '\n' + tab + ('\n' + tab).join(map(str, url_input_list)))
-
-write_log(DebugInfo(None, debug_header, debug_subheader, debug_body))
-
-for link in url_input_list:  # Crawl for each URL the user inputs
-    og_url = link
-    og_url_domain = get_domain(og_url)
-
-    crawl(link, total_depth)
+        if print_level_input == '':
+            break
+        else:
+            try:
+                if (int(print_level_input) >= 0 and
+                        int(print_level_input) <= 2):
+                    print_level = int(print_level_input)
+                    break
+                else:
+                    print("\n***\nINVALID INPUT\n***\n")
+                    continue
+            except Exception:
+                print("\n***\nINVALID INPUT\n***\n")
+                continue
 
-    if is_save_mode:
-        url_log.write('END CRAWL: ' + link + '\n\n')
-
-if print_level > 0:
-    if is_scrape_mode:
-        print('\n\nEmails:')
-        print('\n'.join(map(str, email_list)))
-
-        print('\n\nPhone Numbers:')
-        print('\n'.join(map(str, phone_list)))
-
-job_stats = (
-    '**Job Stats**\n' +
-    'Errors: ' + str(error_count) + '\n' +
-    str(timedelta.total_seconds(datetime.now() - start_time)) + ' seconds\n' +
-    'Timestamp: ' + timestamp
-    )
-
-print('\n\n\n' + job_stats)
-print('JobID: ' + job_id)
-debug_log.write(job_stats)
+    try:
+        run_job(url_input_list, is_resumed)
+    finally:
+        close_shared()